@@ -0,0 +1,239 @@
+"""
+Command line interface of ascp, run as `python -m ascp <command>`.
+
+Instances are given as paths to their `a` files or directories containing them. Without any path,
+paths are read from stdin one per line, so the commands compose with `find` and `xargs`. Modules
+depending on OR-Tools are only imported by the commands which need them.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import typing as tp
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from .load_instance import load_instance
+
+if tp.TYPE_CHECKING:
+    from .instance import Instance
+    from .solution import Solution
+
+
+def __instance_files(paths: list[str]) -> tp.Iterator[str]:
+    if not paths:
+        paths = [line.strip() for line in sys.stdin if line.strip()]
+
+    for path in paths:
+        if os.path.isdir(path):
+            yield from sorted(
+                os.path.join(path, f)
+                for f in os.listdir(path)
+                if f.lower().endswith("a.rcp") and not f.startswith((".", "!"))
+            )
+        else:
+            yield path
+
+
+def __load_solution(path: str, ins: "Instance") -> "Solution":
+    from .solution import Solution
+
+    with open(path) as f:
+        return Solution.from_dump(f.read(), ins)
+
+
+def __load(args: argparse.Namespace) -> int:
+    from .instance import WtInstance
+
+    print("name", "kind", "activities", "resources", "subgraphs", sep="\t")
+    for file in __instance_files(args.paths):
+        ins = load_instance(file)
+        kind = "wt" if isinstance(ins, WtInstance) else "aslib"
+        print(ins.name, kind, len(ins.activities), len(ins.resources), len(ins.subgraphs), sep="\t")
+    return 0
+
+
+def __validate(args: argparse.Namespace) -> int:
+    files = list(__instance_files(args.paths))
+    err_message = lambda: "--solution can only be validated against a single instance"
+    assert args.solution is None or len(files) == 1, err_message()
+
+    failed = 0
+    for file in files:
+        try:
+            ins = load_instance(file)
+        except (AssertionError, OSError, StopIteration, ValueError) as e:
+            print(f"{file}\tinvalid\t{e or type(e).__name__}")
+            failed += 1
+            continue
+
+        if args.solution is None:
+            print(f"{file}\tok")
+            continue
+
+        from .verify import verify_solution
+        violations = verify_solution(ins, __load_solution(args.solution, ins))
+        for v in violations:
+            print(f"{args.solution}\t{v}")
+        print(f"{args.solution}\t{'ok' if not violations else f'{len(violations)} violations'}")
+        failed += bool(violations)
+
+    return 1 if failed else 0
+
+
+def __solve_file(file: str, time_limit: float, workers: int, out: str | None) -> str:
+    from ortools.sat.python.cp_model import CpSolver
+    from ortools.sat.sat_parameters_pb2 import SatParameters
+
+    from .model import Model
+    from .solver import Solver
+
+    ins = load_instance(file)
+    cp_solver = CpSolver()
+    cp_solver.parameters = SatParameters(max_time_in_seconds=time_limit, num_workers=workers)
+    solved = Solver(cp_solver).solve(Model(ins))
+
+    found = bool(solved.solution_times)
+    status = "OPTIMAL" if found and solved.is_optimal else cp_solver.status_name()
+    if found and out is not None:
+        with open(os.path.join(out, f"{ins.name}.sol"), "w") as f:
+            f.write(solved.solution.dump() + "\n")
+
+    objective = solved.solution.objective if found else ""
+    return "\t".join(map(str, [ins.name, status, objective, solved.best_bound, f"{cp_solver.wall_time:.2f}"]))
+
+
+def __solve_remote(file: str, socket_path: str, time_limit: float, workers: int, out: str | None) -> str:
+    from .daemon import DaemonClient
+
+    with DaemonClient(socket_path) as client:
+        response = client.solve(os.path.abspath(file), time_limit=time_limit, workers=workers)
+    err_message = lambda: f"{file}: {response['error']}"
+    assert "error" not in response, err_message()
+
+    if response["solution"] is not None and out is not None:
+        with open(os.path.join(out, f"{response['name']}.sol"), "w") as f:
+            f.write(response["solution"] + "\n")
+
+    objective = response["objective"] if response["objective"] is not None else ""
+    seconds = response["telemetry"]["solve_seconds"]
+    return "\t".join(map(str, [response["name"], response["status"], objective, response["bound"], f"{seconds:.2f}"]))
+
+
+def __solve(args: argparse.Namespace) -> int:
+    if args.out is not None:
+        os.makedirs(args.out, exist_ok=True)
+
+    files = list(__instance_files(args.paths))
+    solve = lambda file: __solve_file(file, args.time_limit, args.workers, args.out)
+
+    print("name", "status", "objective", "bound", "seconds", sep="\t", flush=True)
+    if args.daemon is not None:
+        solve = lambda file: __solve_remote(file, args.daemon, args.time_limit, args.workers, args.out)
+        with ThreadPoolExecutor(max(args.parallel, 1)) as pool:
+            for row in pool.map(solve, files):
+                print(row, flush=True)
+        return 0
+
+    if args.parallel <= 1:
+        for file in files:
+            print(solve(file), flush=True)
+        return 0
+
+    with ProcessPoolExecutor(args.parallel) as pool:
+        n = len(files)
+        rows = pool.map(__solve_file, files, [args.time_limit] * n, [args.workers] * n, [args.out] * n)
+        for row in rows:
+            print(row, flush=True)
+    return 0
+
+
+def __daemon(args: argparse.Namespace) -> int:
+    from .daemon import DaemonConfig, serve
+
+    serve(DaemonConfig(
+        socket_path=args.socket,
+        workers=args.workers,
+        instance_cache=args.instance_cache,
+        model_cache=args.model_cache,
+        time_limit=args.time_limit,
+        solver_workers=args.solver_workers,
+        preload=[os.path.abspath(f) for f in __instance_files(args.preload)] if args.preload else [],
+    ))
+    return 0
+
+
+def __dump(args: argparse.Namespace) -> int:
+    from .write_instance import write_instance
+
+    for file in __instance_files(args.paths):
+        ins = load_instance(file)
+        target = Path(args.out) / Path(file).name
+        write_instance(ins, target, overwrite=args.overwrite)
+        print(target)
+    return 0
+
+
+def __dot(args: argparse.Namespace) -> int:
+    from .graphviz import show_instance
+
+    ins = load_instance(args.path)
+    solution = __load_solution(args.solution, ins) if args.solution is not None else None
+    show_instance(ins, solution)
+    return 0
+
+
+def __parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m ascp", description="ASCP instance tools and solver")
+    commands = parser.add_subparsers(dest="command", required=True)
+    paths = lambda p: p.add_argument("paths", nargs="*", help="instance a files or directories, stdin if empty")
+
+    load = commands.add_parser("load", help="load instances and print their sizes")
+    paths(load)
+    load.set_defaults(run=__load)
+
+    validate = commands.add_parser("validate", help="check that instances load, and optionally a solution")
+    paths(validate)
+    validate.add_argument("--solution", help="solution in the Solution.dump format to verify")
+    validate.set_defaults(run=__validate)
+
+    solve = commands.add_parser("solve", help="solve instances with CP-SAT")
+    paths(solve)
+    solve.add_argument("--time-limit", type=float, default=60, help="seconds per instance")
+    solve.add_argument("--workers", type=int, default=8, help="CP-SAT workers per instance")
+    solve.add_argument("--parallel", type=int, default=1, help="instances solved at once")
+    solve.add_argument("--out", help="directory to write solution dumps to")
+    solve.add_argument("--daemon", metavar="SOCKET", help="send the instances to a running daemon instead")
+    solve.set_defaults(run=__solve)
+
+    daemon = commands.add_parser("daemon", help="serve solve requests on a Unix socket with warm workers")
+    daemon.add_argument("--socket", default=os.path.join(tempfile.gettempdir(), "ascp.sock"), help="socket path")
+    daemon.add_argument("--workers", type=int, default=2, help="worker processes, each solving one request")
+    daemon.add_argument("--instance-cache", type=int, default=64, help="parsed instances kept per worker")
+    daemon.add_argument("--model-cache", type=int, default=16, help="built models kept per worker")
+    daemon.add_argument("--time-limit", type=float, default=60, help="seconds of requests without a limit")
+    daemon.add_argument("--solver-workers", type=int, default=8, help="CP-SAT workers of requests without them")
+    daemon.add_argument("--preload", nargs="*", help="instances loaded and built by every worker at start")
+    daemon.set_defaults(run=__daemon)
+
+    dump = commands.add_parser("dump", help="write instances back in the canonical file format")
+    paths(dump)
+    dump.add_argument("--out", required=True, help="output directory")
+    dump.add_argument("--overwrite", action="store_true")
+    dump.set_defaults(run=__dump)
+
+    dot = commands.add_parser("dot", help="print an instance as a graphviz graph")
+    dot.add_argument("path", help="instance a file")
+    dot.add_argument("--solution", help="solution in the Solution.dump format to annotate")
+    dot.set_defaults(run=__dot)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = __parser().parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
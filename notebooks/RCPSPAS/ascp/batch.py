@@ -0,0 +1,185 @@
+import math
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from ortools.sat.python.cp_model import CpSolver
+from ortools.sat.sat_parameters_pb2 import SatParameters
+
+from . import instance
+from .bounds import lower_bounds
+from .model import Model, ModelConfig
+from .solver import Solution, SolvedSolver, Solver
+from .utils import Timer, iterate_instances
+
+
+@dataclass
+class BatchConfig:
+    """
+    Configuration of `run_batch`.
+
+    Attributes:
+        budget (float): Total wall-clock budget of the whole batch in seconds.
+        first_pass (float): Time limit of the first solve of every instance. It is lowered if
+            the budget can not afford it for all instances.
+        min_slice (float): Shortest follow-up solve worth starting.
+        growth (float): Every follow-up solve of an instance is `growth` times longer than its
+            previous one, so hard instances get long uninterrupted runs.
+        params (SatParameters): Base parameters of every solve, the time limit is overridden.
+        model_config (ModelConfig): Configuration of the models.
+    """
+    budget: float
+    first_pass: float = 1
+    min_slice: float = 0.5
+    growth: float = 2
+    params: SatParameters = field(default_factory=lambda: SatParameters(num_workers=8))
+    model_config: ModelConfig = field(default_factory=ModelConfig)
+
+
+@dataclass
+class BatchRun:
+    """
+    State of one instance of the batch.
+
+    Attributes:
+        instance (instance.Instance): The instance.
+        lower_bound (int): Bound from `ascp.bounds`, the search stops when it is reached.
+        solution (Solution | None): Best solution over all solves.
+        best_bound (int): Best lower bound over all solves.
+        solution_times (list[Solver.SolutionSnapshot]): Improvements over all solves, with wall
+            times counted over the solves of this instance only.
+        time_spent (float): Wall time of all solves of the instance.
+        last_slice (float): Time limit of the last solve.
+        solves (int): Number of solves.
+        stalls (int): Number of consecutive solves without an improvement.
+        optimal (bool): Whether the solution is proven optimal.
+        status (str): CP-SAT status of the last solve, "UNKNOWN" before the first one.
+    """
+    instance: instance.Instance
+    lower_bound: int
+    solution: Solution | None = None
+    best_bound: int = 0
+    solution_times: list[Solver.SolutionSnapshot] = field(default_factory=list)
+    time_spent: float = 0.0
+    last_slice: float = 0.0
+    solves: int = 0
+    stalls: int = 0
+    optimal: bool = False
+    status: str = "UNKNOWN"
+
+    @property
+    def finished(self) -> bool:
+        """Whether more solves can not help, the instance is solved optimally, infeasible or invalid."""
+        return self.optimal or self.status in ("INFEASIBLE", "MODEL_INVALID")
+
+    @property
+    def objective(self) -> int | None:
+        return self.solution.objective if self.solution else None
+
+    @property
+    def gap(self) -> float:
+        if self.solution is None: return math.inf
+        if self.solution.objective <= self.best_bound: return 0.0
+        return (self.solution.objective - self.best_bound) / max(1, abs(self.solution.objective))
+
+    def improvement_rate(self, window: float) -> float:
+        """Relative objective improvement per second over the last `window` seconds of solving."""
+        if not self.solution_times: return math.inf
+        current = self.solution_times[-1].objective
+        since = self.time_spent - window
+        earlier = [s.objective for s in self.solution_times if s.wall_time <= since]
+        if not earlier: return math.inf
+        return (earlier[-1] - current) / max(1, abs(earlier[-1])) / window
+
+    def update(self, solved: SolvedSolver):
+        offset = self.time_spent
+        self.time_spent += solved.cp_solver.wall_time
+        self.solves += 1
+        self.status = solved.cp_solver.status_name()
+
+        improvements = [
+            s for s in solved.solution_times
+            if self.solution is None or s.objective < self.solution.objective
+        ]
+        self.stalls = 0 if improvements else self.stalls + 1
+        for s in improvements:
+            self.solution_times.append(Solver.SolutionSnapshot(
+                s.objective, s.deterministic_time, s.user_time, s.wall_time + offset,
+            ))
+
+        # without any solution, the values read by the solver are meaningless
+        if not solved.solution_times: return
+        if self.solution is None or solved.solution.objective <= self.solution.objective:
+            self.solution = solved.solution
+        self.best_bound = max(self.best_bound, solved.best_bound)
+        self.optimal = self.optimal or solved.is_optimal or self.gap == 0
+
+
+def __solve(run: BatchRun, config: BatchConfig, time_limit: float) -> SolvedSolver:
+    model = Model(run.instance, config=config.model_config)
+    if run.solution is not None:
+        model.add_hint(run.solution)
+
+    params = SatParameters()
+    params.CopyFrom(config.params)
+    params.max_time_in_seconds = time_limit
+    cp_solver = CpSolver()
+    cp_solver.parameters = params
+
+    run.last_slice = time_limit
+    return Solver(cp_solver).solve(model, run.lower_bound)
+
+
+def __priority(run: BatchRun) -> float:
+    """
+    Instances which are not proven optimal are ranked by their gap, weighted by how much they
+    improved during their last solve and divided by the number of solves in a row without an
+    improvement, so stalled instances yield to the ones still improving. Instances without a
+    solution count as a gap of 100% decaying in the same way, so an instance which never finds a
+    solution does not take the whole budget.
+    """
+    if run.finished: return -math.inf
+    if run.solution is None: return 1 / max(1, run.stalls)
+
+    rate = run.improvement_rate(run.last_slice)
+    return run.gap * (1 + min(rate, 1) * run.last_slice) / (1 + run.stalls)
+
+
+def run_batch(
+    instances: Iterable[instance.Instance] | str,
+    config: BatchConfig,
+) -> list[BatchRun]:
+    """
+    Solves a batch of instances within a single wall-clock budget. Every instance first gets a
+    short solve. The rest of the budget is then repeatedly given to the instance with the highest
+    `__priority`, which is resumed from its incumbent with a `growth` times longer time limit,
+    until the budget is spent or all instances are finished. Instances the first pass does not
+    reach within the budget keep no solution.
+
+    `instances` is either an iterable of instances or a directory passed to `iterate_instances`.
+    """
+    timer = Timer()
+    if isinstance(instances, str):
+        instances = iterate_instances(instances, show_progress=False)
+    objective_type = lambda ins: "wt" if isinstance(ins, instance.WtInstance) else "cmax"
+    runs = [BatchRun(ins, lower_bounds(ins).objective(objective_type(ins))) for ins in instances]
+    if not runs:
+        return runs
+
+    remaining = lambda: config.budget - timer.elapsed_time()
+
+    first_pass = min(config.first_pass, remaining() / len(runs))
+    for i, run in enumerate(runs):
+        # instances left when the budget is spent are not solved at all
+        if remaining() < config.min_slice: break
+        # instances which finish early leave their time to the rest of the first pass
+        time_limit = max(config.min_slice, min(first_pass, remaining() / (len(runs) - i)))
+        run.update(__solve(run, config, time_limit))
+
+    while remaining() >= config.min_slice:
+        run = max(runs, key=__priority)
+        if run.finished: break
+
+        time_limit = min(remaining(), max(config.min_slice, config.growth * run.last_slice))
+        run.update(__solve(run, config, time_limit))
+
+    return runs
@@ -0,0 +1,209 @@
+import heapq
+import math
+import typing as tp
+from dataclasses import dataclass
+
+from . import instance
+from .presolve import Implications
+from .redundant import incompatible_cliques, topological_order
+
+
+@dataclass(frozen=True)
+class LowerBounds:
+    """
+    Lower bounds on the objectives of an instance.
+
+    Attributes:
+        critical_path (int): Longest path over precedences enforced whenever an activity is
+            scheduled, taking the shortest alternative of every subgraph that must be executed.
+        energy (int): Per-resource energy bound, the minimal energy over alternative branches
+            divided by capacity, plus the smallest head and tail, and the same over the always
+            scheduled activities released no earlier than each head.
+        one_machine (int): Jackson's preemptive schedule of every clique of always scheduled
+            activities which can not overlap, with heads and tails.
+        weighted_tardiness (int | None): Tardiness of the due date activities finishing at their
+            earliest possible end, None for instances without due dates.
+    """
+    critical_path: int
+    energy: int
+    one_machine: int
+    weighted_tardiness: int | None = None
+
+    @property
+    def cmax(self) -> int:
+        return max(self.critical_path, self.energy, self.one_machine)
+
+    def objective(self, objective_type: tp.Literal["cmax", "wt"]) -> int:
+        match objective_type:
+            case "cmax": return self.cmax
+            case "wt": return self.weighted_tardiness or 0
+            case _: raise ValueError(f"Invalid objective: {objective_type}")
+
+
+class __Longest:
+    """
+    Heads (earliest starts) and tails (shortest time from the end to the end of the schedule) of
+    activities, valid in every solution in which the activity is scheduled.
+    """
+
+    def __init__(self, ins: instance.Instance, tmin: int):
+        self.ins = ins
+        self.implications = Implications(ins)
+        self.subgraph_of = {b: sg for sg in ins.subgraphs for b in sg.branches}
+        self.predecessors: list[list[int]] = [[] for _ in ins.activities]
+        for a in ins.activities:
+            for s in a.successors:
+                self.predecessors[s].append(a.id)
+
+        order = topological_order(ins)
+        durations = [a.duration for a in ins.activities]
+
+        self.heads = [tmin] * len(ins.activities)
+        for v in order:
+            ends = {p: self.heads[p] + durations[p] for p in self.predecessors[v]}
+            self.heads[v] = max(tmin, self.__bound(v, ends))
+
+        self.tails = [0] * len(ins.activities)
+        for v in reversed(order):
+            starts = {s: durations[s] + self.tails[s] for s in ins.activities[v].successors}
+            self.tails[v] = self.__bound(v, starts)
+
+    def __bound(self, v: int, neighbours: dict[int, int]) -> int:
+        """
+        Bound on the distance to `v` from its neighbours (either predecessors or successors),
+        where `neighbours` maps every neighbour to its own bound. Neighbours implied by `v` count
+        directly. For a subgraph whose branching activity is implied by `v`, one of its branches is
+        selected, so the smallest bound over the branches counts.
+        """
+        implications = self.implications
+        bound = 0
+        subgraphs = {}
+        for n, value in neighbours.items():
+            if implications.implies(v, n):
+                bound = max(bound, value)
+            for b in self.ins.activities[n].branches:
+                if b != 0:
+                    subgraphs[self.subgraph_of[b].id] = self.subgraph_of[b]
+
+        for sg in subgraphs.values():
+            if not implications.implies(v, sg.principal_activity): continue
+            bound = max(bound, min(
+                max((value for n, value in neighbours.items() if implications.branch_implies(b, n)), default=0)
+                for b in sg.branches
+            ))
+
+        return bound
+
+
+def __critical_path(longest: __Longest) -> int:
+    return max((
+        longest.heads[a.id] + a.duration + longest.tails[a.id]
+        for a in longest.ins.activities
+        if 0 in a.branches
+    ), default=0)
+
+
+def __energy(longest: __Longest) -> int:
+    ins = longest.ins
+    branch_activities: dict[int, list[instance.Activity]] = {b: [] for sg in ins.subgraphs for b in sg.branches}
+    for a in ins.activities:
+        if len(a.branches) == 1 and 0 not in a.branches:
+            branch_activities[next(iter(a.branches))].append(a)
+    # subgraphs which are always executed, activities of nested subgraphs and linked activities
+    # only ever add energy, so they are left out
+    executed = [sg for sg in ins.subgraphs if 0 in ins.activities[sg.principal_activity].branches]
+
+    bound = 0
+    for r, capacity in enumerate(ins.resources):
+        energy = lambda a: a.duration * a.requirements[r]
+
+        always = [a for a in ins.activities if 0 in a.branches and energy(a) > 0]
+        total = sum(energy(a) for a in always)
+        candidates = list(always)
+        for sg in executed:
+            total += min(sum(energy(a) for a in branch_activities[b]) for b in sg.branches)
+            candidates += [a for b in sg.branches for a in branch_activities[b] if energy(a) > 0]
+
+        if total > 0:
+            head = min(longest.heads[a.id] for a in candidates)
+            tail = min(longest.tails[a.id] for a in candidates)
+            bound = max(bound, head + math.ceil(total / capacity) + tail)
+
+        # always scheduled activities starting no earlier than a head
+        suffix_energy = 0
+        min_tail = math.inf
+        for a in sorted(always, key=lambda a: longest.heads[a.id], reverse=True):
+            suffix_energy += energy(a)
+            min_tail = min(min_tail, longest.tails[a.id])
+            bound = max(bound, longest.heads[a.id] + math.ceil(suffix_energy / capacity) + int(min_tail))
+
+    return bound
+
+
+def __jackson_preemptive_schedule(jobs: list[tuple[int, int, int]]) -> int:
+    """Optimal preemptive one-machine schedule of `(head, duration, tail)` jobs, returns max end plus tail."""
+    jobs = sorted(jobs)
+    ready: list[tuple[int, int, int]] = []
+    bound = 0
+    time = 0
+    i = 0
+
+    while i < len(jobs) or ready:
+        if not ready:
+            time = max(time, jobs[i][0])
+        while i < len(jobs) and jobs[i][0] <= time:
+            head, duration, tail = jobs[i]
+            heapq.heappush(ready, (-tail, duration, tail))
+            i += 1
+
+        priority, remaining, tail = heapq.heappop(ready)
+        next_release = jobs[i][0] if i < len(jobs) else math.inf
+        run = min(remaining, next_release - time)
+        time += run
+        if run < remaining:
+            heapq.heappush(ready, (priority, remaining - run, tail))
+        else:
+            bound = max(bound, time + tail)
+
+    return bound
+
+
+def __one_machine(longest: __Longest) -> int:
+    ins = longest.ins
+    bound = 0
+    for clique in incompatible_cliques(ins):
+        jobs = [
+            (longest.heads[a], ins.activities[a].duration, longest.tails[a])
+            for a in clique
+            if 0 in ins.activities[a].branches
+        ]
+        if len(jobs) > 1:
+            bound = max(bound, __jackson_preemptive_schedule(jobs))
+    return bound
+
+
+def __weighted_tardiness(longest: __Longest) -> int | None:
+    ins = longest.ins
+    if not isinstance(ins, instance.WtInstance):
+        return None
+
+    return sum(
+        dd.weight * max(0, longest.heads[a] + ins.activities[a].duration - dd.due_date)
+        for a, dd in ins.due_dates.items()
+        if 0 in ins.activities[a].branches
+    )
+
+
+def lower_bounds(ins: instance.Instance, *, tmin: int = 0) -> LowerBounds:
+    """
+    Computes lower bounds of an instance without solving it. All bounds are derived from heads
+    and tails computed in a single pass over the precedence graph, so they take milliseconds even
+    for instances with thousands of activities.
+    """
+    longest = __Longest(ins, tmin)
+    return LowerBounds(
+        critical_path=__critical_path(longest),
+        energy=__energy(longest),
+        one_machine=__one_machine(longest),
+        weighted_tardiness=__weighted_tardiness(longest),
+    )
@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import time
+import typing as tp
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from google.protobuf import text_format
+from ortools.sat.python.cp_model import CpSolver, CpSolverSolutionCallback
+from ortools.sat.sat_parameters_pb2 import SatParameters
+
+from . import instance
+from .model import Model, ModelConfig
+from .solver import Solution, SolvedSolver, Solver
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """
+    Persisted state of an interrupted or finished solve.
+
+    Attributes:
+        instance (str): Name of the solved instance.
+        objective_type (str): Objective of the model, "cmax" or "wt".
+        solution (Solution): Incumbent at the time of the checkpoint.
+        solution_times (list[Solver.SolutionSnapshot]): Improvements over all runs so far, with
+            wall times counted from the start of the first run.
+        parameters (str): Effective `SatParameters` in protobuf text format.
+        time_limit (float): Total time budget over all runs.
+        elapsed (float): Wall time spent over all runs so far.
+        lower_bound (int): Lower bound the search stops at.
+        finished (bool): Whether the last run ended on its own instead of being interrupted.
+    """
+    instance: str
+    objective_type: tp.Literal["cmax", "wt"]
+    solution: Solution
+    solution_times: list[Solver.SolutionSnapshot]
+    parameters: str
+    time_limit: float
+    elapsed: float
+    lower_bound: int
+    finished: bool = False
+
+    @property
+    def remaining_time(self) -> float:
+        return max(0.0, self.time_limit - self.elapsed)
+
+    def sat_parameters(self) -> SatParameters:
+        return text_format.Parse(self.parameters, SatParameters())
+
+    def save(self, path: str | Path):
+        """Writes the checkpoint atomically, so a preempted write never corrupts the previous one."""
+        d = asdict(self)
+        d["solution"] = self.solution.dump()
+        d["solution_times"] = [asdict(s) for s in self.solution_times]
+
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(d, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str | Path, ins: instance.Instance) -> "Checkpoint":
+        with open(path) as f:
+            d = json.load(f)
+
+        err_message = lambda: f"Checkpoint of instance {d['instance']} can not be loaded for instance {ins.name}"
+        assert d["instance"] == ins.name, err_message()
+
+        d["solution"] = Solution.from_dump(d["solution"], ins)
+        d["solution_times"] = [Solver.SolutionSnapshot(**s) for s in d["solution_times"]]
+        return cls(**d)
+
+
+class Checkpointer:
+    """
+    Persists the incumbent of a `Solver.solve` run to `path`. The first incumbent is written at
+    once, later ones at most every `interval` seconds: an incumbent arriving sooner is kept pending
+    and written by a timer, so the last improvement is never lost to a stagnating search. The solve
+    ends with a final write. Pass it as `Solver.solve(model, checkpoint=...)`.
+
+    A resumed run never replaces the incumbent of its `previous` checkpoint with a worse one, and a
+    run without any solution keeps the previous incumbent and does not mark it finished.
+    """
+
+    def __init__(self,
+        path: str | Path,
+        interval: float = 30,
+        *,
+        previous: Checkpoint | None = None,
+    ):
+        self.path = Path(path)
+        self.interval = interval
+        self.__previous = previous
+        self.__started = time.monotonic()
+        self.__last_save = -float("inf")
+        self.__parameters = ""
+        self.__time_limit = 0.0
+        self.__lower_bound = 0
+        self.__lock = threading.Lock()
+        self.__pending: tuple[Model, Solution, list[Solver.SolutionSnapshot]] | None = None
+        self.__timer: threading.Timer | None = None
+
+    @property
+    def __elapsed_before(self) -> float:
+        return self.__previous.elapsed if self.__previous else 0.0
+
+    def start(self, model: Model, params: SatParameters, lower_bound: int):
+        self.__parameters = text_format.MessageToString(params)
+        self.__time_limit = self.__elapsed_before + params.max_time_in_seconds
+        self.__lower_bound = lower_bound
+        self.__started = time.monotonic()
+        self.__last_save = -float("inf")
+
+    def __history(self, solution_times: list[Solver.SolutionSnapshot]) -> list[Solver.SolutionSnapshot]:
+        offset = self.__elapsed_before
+        previous = self.__previous.solution_times if self.__previous else []
+        # the first solution of a resumed run is usually the hinted incumbent again
+        return previous + [
+            Solver.SolutionSnapshot(s.objective, s.deterministic_time, s.user_time, s.wall_time + offset)
+            for s in solution_times
+            if not previous or s.objective < previous[-1].objective
+        ]
+
+    def __save(self, model: Model, solution: Solution | None, solution_times, wall_time: float, finished: bool):
+        """Writes `solution`, or the previous incumbent if it is better or `solution` is None."""
+        if self.__previous is not None and (solution is None or self.__previous.solution.objective < solution.objective):
+            solution = self.__previous.solution
+        if solution is None:
+            return
+
+        Checkpoint(
+            instance=model.instance.name,
+            objective_type=model.objective_type,
+            solution=solution,
+            solution_times=self.__history(solution_times),
+            parameters=self.__parameters,
+            time_limit=self.__time_limit,
+            elapsed=self.__elapsed_before + wall_time,
+            lower_bound=self.__lower_bound,
+            finished=finished,
+        ).save(self.path)
+        self.__last_save = time.monotonic()
+
+    def __flush(self):
+        with self.__lock:
+            self.__timer = None
+            if self.__pending is not None:
+                model, solution, solution_times = self.__pending
+                self.__pending = None
+                self.__save(model, solution, solution_times, time.monotonic() - self.__started, finished=False)
+
+    def on_solution(self, cb: CpSolverSolutionCallback, model: Model, solution_times: list[Solver.SolutionSnapshot]):
+        with self.__lock:
+            self.__pending = (model, Solution.from_values(model, cb.value), list(solution_times))
+            wait = self.__last_save + self.interval - time.monotonic()
+            if wait > 0:
+                if self.__timer is None:
+                    self.__timer = threading.Timer(wait, self.__flush)
+                    self.__timer.daemon = True
+                    self.__timer.start()
+                return
+        self.__flush()
+
+    def finish(self, solved: SolvedSolver):
+        with self.__lock:
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+            self.__pending = None
+
+            # without a solution the solver's values are meaningless, the run is not final
+            found = bool(solved.solution_times)
+            solution = solved.solution if found else None
+            self.__save(solved.model, solution, solved.solution_times, solved.cp_solver.wall_time, finished=found)
+
+
+def resume(
+    path: str | Path,
+    ins: instance.Instance,
+    config: ModelConfig = ModelConfig(),
+    *,
+    interval: float = 30,
+) -> SolvedSolver:
+    """
+    Continues an interrupted solve from its checkpoint. A fresh model of the instance is hinted
+    with the checkpointed incumbent and solved with the checkpointed parameters for the rest of
+    the time budget, while checkpointing to the same file.
+    """
+    previous = Checkpoint.load(path, ins)
+    if previous.finished or previous.remaining_time <= 0:
+        raise ValueError(f"Checkpoint {path} is already finished, its solution is final")
+
+    model = Model(ins, previous.objective_type, config)
+    model.add_hint(previous.solution)
+
+    params = previous.sat_parameters()
+    params.max_time_in_seconds = previous.remaining_time
+    cp_solver = CpSolver()
+    cp_solver.parameters = params
+
+    checkpoint = Checkpointer(path, interval, previous=previous)
+    return Solver(cp_solver).solve(model, previous.lower_bound, checkpoint)
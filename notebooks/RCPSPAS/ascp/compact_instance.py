@@ -0,0 +1,254 @@
+import dataclasses
+from collections.abc import Iterable, Sequence
+from multiprocessing.shared_memory import SharedMemory
+from typing import overload
+
+import numpy as np
+
+from .instance import Activity
+
+
+class ActivityView:
+    """
+    Lightweight read-only view of a single activity of `CompactActivities`. Exposes the same
+    attributes as `ascp.instance.Activity`, but builds them from the underlying arrays on access,
+    so successors and branches are frozensets. Use `to_activity` for a mutable copy.
+    """
+    __slots__ = ("__activities", "id")
+
+    def __init__(self, activities: "CompactActivities", id: int):
+        self.__activities = activities
+        self.id = id
+
+    @property
+    def duration(self) -> int:
+        return int(self.__activities.durations[self.id])
+
+    @property
+    def successors(self) -> frozenset[int]:
+        return frozenset(self.__activities.successor_ids(self.id).tolist())
+
+    @property
+    def branches(self) -> frozenset[int]:
+        return frozenset(self.__activities.branch_ids(self.id).tolist())
+
+    @property
+    def requirements(self) -> list[int]:
+        return self.__activities.requirements[self.id].tolist()
+
+    def to_activity(self) -> Activity:
+        return Activity(
+            id=self.id,
+            duration=self.duration,
+            successors=set(self.successors),
+            branches=set(self.branches),
+            requirements=self.requirements,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (ActivityView, Activity)):
+            return NotImplemented
+
+        return (
+            self.id == other.id
+            and self.duration == other.duration
+            and self.successors == other.successors
+            and self.branches == other.branches
+            and self.requirements == other.requirements
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"ActivityView(id={self.id}, duration={self.duration}, successors={self.successors}, "
+            f"branches={self.branches}, requirements={self.requirements})"
+        )
+
+
+class CompactActivities(Sequence[ActivityView]):
+    """
+    Array-backed replacement for the `activities` list of an instance. Durations and requirements
+    are stored as dense arrays, successors and branches as CSR adjacency (`*_indptr` holds offsets
+    into `*_indices`).
+
+    Calling `share` moves the arrays into a single shared memory block. A shared instance pickles
+    to just the block name and layout, so worker processes attach to it without copying. Every
+    process calls `close` once it is done with its copy, the owner of the block also `unlink`.
+    """
+
+    __FIELDS = (
+        "durations",
+        "requirements",
+        "successor_indptr",
+        "successor_indices",
+        "branch_indptr",
+        "branch_indices",
+    )
+
+    def __init__(self,
+        durations: np.ndarray,
+        requirements: np.ndarray,
+        successor_indptr: np.ndarray,
+        successor_indices: np.ndarray,
+        branch_indptr: np.ndarray,
+        branch_indices: np.ndarray,
+        shared: tuple[SharedMemory, list[tuple[str, tuple[int, ...], int]]] | None = None,
+    ):
+        activity_count = len(durations)
+        assert requirements.shape[0] == activity_count, "requirements must have a row per activity"
+        assert len(successor_indptr) == activity_count + 1, "successor_indptr must have activity_count + 1 entries"
+        assert len(branch_indptr) == activity_count + 1, "branch_indptr must have activity_count + 1 entries"
+
+        self.durations = durations
+        self.requirements = requirements
+        self.successor_indptr = successor_indptr
+        self.successor_indices = successor_indices
+        self.branch_indptr = branch_indptr
+        self.branch_indices = branch_indices
+        self.__shared = shared
+
+    @classmethod
+    def from_activities(cls, activities: Iterable[Activity]) -> "CompactActivities":
+        if isinstance(activities, CompactActivities):
+            return activities
+
+        activities = sorted(activities, key=lambda a: a.id)
+        err_message = lambda: "Activity IDs must be consecutive integers starting from 0"
+        assert all(a.id == i for i, a in enumerate(activities)), err_message()
+
+        def csr(sets: list[set[int]]) -> tuple[np.ndarray, np.ndarray]:
+            indptr = np.zeros(len(sets) + 1, np.int64)
+            np.cumsum([len(s) for s in sets], out=indptr[1:])
+            indices = np.fromiter((i for s in sets for i in sorted(s)), np.int32, int(indptr[-1]))
+            return indptr, indices
+
+        resource_count = len(activities[0].requirements) if activities else 0
+        successor_indptr, successor_indices = csr([a.successors for a in activities])
+        branch_indptr, branch_indices = csr([a.branches for a in activities])
+
+        return cls(
+            durations=np.fromiter((a.duration for a in activities), np.int64, len(activities)),
+            requirements=np.array([a.requirements for a in activities], np.int64).reshape(-1, resource_count),
+            successor_indptr=successor_indptr,
+            successor_indices=successor_indices,
+            branch_indptr=branch_indptr,
+            branch_indices=branch_indices,
+        )
+
+    def __len__(self) -> int:
+        return len(self.durations)
+
+    @overload
+    def __getitem__(self, idx: int) -> ActivityView: ...
+    @overload
+    def __getitem__(self, idx: slice) -> list[ActivityView]: ...
+    def __getitem__(self, idx: int | slice):
+        if isinstance(idx, slice):
+            return [ActivityView(self, i) for i in range(*idx.indices(len(self)))]
+
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(f"Activity index {idx} out of range")
+
+        return ActivityView(self, idx)
+
+    def with_durations(self, durations: dict[int, int]) -> "CompactActivities":
+        """Returns a copy with the given activity durations, sharing all other arrays."""
+        new_durations = np.array(self.durations)
+        for activity, duration in durations.items():
+            new_durations[activity] = duration
+        return CompactActivities(
+            new_durations,
+            self.requirements,
+            self.successor_indptr,
+            self.successor_indices,
+            self.branch_indptr,
+            self.branch_indices,
+        )
+
+    def successor_ids(self, activity: int) -> np.ndarray:
+        return self.successor_indices[self.successor_indptr[activity]:self.successor_indptr[activity + 1]]
+
+    def branch_ids(self, activity: int) -> np.ndarray:
+        return self.branch_indices[self.branch_indptr[activity]:self.branch_indptr[activity + 1]]
+
+    def edges(self) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the precedence graph as `(source, target)` arrays."""
+        sources = np.repeat(np.arange(len(self), dtype=np.int32), np.diff(self.successor_indptr))
+        return sources, self.successor_indices
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, f).nbytes for f in CompactActivities.__FIELDS)
+
+    @property
+    def is_shared(self) -> bool:
+        return self.__shared is not None
+
+    def share(self) -> "CompactActivities":
+        """
+        Returns a copy backed by a shared memory block. The caller owns the block and must call
+        `unlink` once no process needs it anymore.
+        """
+        arrays = [np.ascontiguousarray(getattr(self, f)) for f in CompactActivities.__FIELDS]
+        shm = SharedMemory(create=True, size=max(1, sum(a.nbytes for a in arrays)))
+
+        layout = []
+        offset = 0
+        for array in arrays:
+            layout.append((array.dtype.str, array.shape, offset))
+            np.ndarray(array.shape, array.dtype, buffer=shm.buf, offset=offset)[...] = array
+            offset += array.nbytes
+
+        return CompactActivities.__from_buffer(shm, layout)
+
+    @staticmethod
+    def __from_buffer(shm: SharedMemory, layout: list[tuple[str, tuple[int, ...], int]]) -> "CompactActivities":
+        arrays = [
+            np.ndarray(shape, np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for dtype, shape, offset in layout
+        ]
+        for array in arrays:
+            array.flags.writeable = False
+
+        return CompactActivities(*arrays, shared=(shm, layout))
+
+    @staticmethod
+    def _attach(name: str, layout: list[tuple[str, tuple[int, ...], int]]) -> "CompactActivities":
+        return CompactActivities.__from_buffer(SharedMemory(name=name), layout)
+
+    def __reduce__(self):
+        if self.__shared is None:
+            return (CompactActivities, tuple(getattr(self, f) for f in CompactActivities.__FIELDS))
+
+        shm, layout = self.__shared
+        return (CompactActivities._attach, (shm.name, layout))
+
+    def unlink(self):
+        if self.__shared is not None:
+            self.__shared[0].unlink()
+
+    def close(self):
+        """
+        Detaches this process from the shared memory block, the activities can not be used
+        afterwards. Arrays taken from them, e.g. by `successor_ids`, must be released first.
+        """
+        if self.__shared is None:
+            return
+
+        shm, _ = self.__shared
+        for f in CompactActivities.__FIELDS:
+            setattr(self, f, None)
+        self.__shared = None
+        shm.close()
+
+
+def compact_instance[I](ins: I) -> I:
+    """
+    Returns a copy of the instance whose activities are stored in a `CompactActivities`. The
+    instance class (and so e.g. `isinstance(ins, WtInstance)` checks) is preserved.
+    """
+    return dataclasses.replace(
+        ins,  # type: ignore[type-var]
+        activities=CompactActivities.from_activities(ins.activities),  # type: ignore[attr-defined]
+    )
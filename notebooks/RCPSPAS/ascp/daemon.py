@@ -0,0 +1,564 @@
+"""
+Local solve daemon, run as `python -m ascp daemon`.
+
+Clients connect to a Unix socket and exchange JSON lines. Every request has an `op` and the
+responses to `solve` requests carry its `id`, so one connection may have several solves running:
+
+    {"op": "solve", "id": "1", "path": ".../x_a.RCP", "time_limit": 5, "workers": 8}
+    {"op": "solve", "id": "2", "instance": {"name": "x", "a": "...", "b": "...", "wt": "..."}}
+    {"op": "cancel", "id": "1"}
+    {"op": "stats"}
+    {"op": "shutdown"}
+
+Solves run in a pool of worker processes started with OR-Tools and the model already imported.
+Every worker keeps its own LRU of parsed instances and built models, and solves are sent to an
+idle worker which already holds their instance when there is one. Responses contain the solution
+in the `Solution.dump` format and the telemetry of the request.
+"""
+import hashlib
+import itertools
+import json
+import multiprocessing as mp
+import os
+import queue
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import typing as tp
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, field
+from multiprocessing.connection import Connection
+
+from .__shared import file_a_to_name, other_instance_file_path
+
+if tp.TYPE_CHECKING:
+    from .instance import Instance
+    from .model import Model
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "ascp.sock")
+
+
+@dataclass
+class DaemonConfig:
+    """
+    Configuration of `Daemon`.
+
+    Attributes:
+        socket_path (str): Path of the Unix socket.
+        workers (int): Number of worker processes, each solves one request at a time.
+        instance_cache (int): Parsed instances kept by every worker.
+        model_cache (int): Built models kept by every worker.
+        time_limit (float): Time limit of requests which do not set one.
+        solver_workers (int): CP-SAT workers of requests which do not set them.
+        preload (list[str]): Instance `a` files loaded and built by every worker at start.
+    """
+    socket_path: str = DEFAULT_SOCKET
+    workers: int = 2
+    instance_cache: int = 64
+    model_cache: int = 16
+    time_limit: float = 60
+    solver_workers: int = 8
+    preload: list[str] = field(default_factory=list)
+
+
+class LruCache[K, V]:
+    """Mapping of at most `size` entries, evicting the least recently used one."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.hits = self.misses = 0
+        self.__entries = OrderedDict[K, V]()
+
+    def __contains__(self, key: K) -> bool:
+        return key in self.__entries
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def get_or_create(self, key: K, create: tp.Callable[[], V]) -> tuple[V, bool]:
+        """The cached value and True, or the value created and cached now and False."""
+        if key in self.__entries:
+            self.hits += 1
+            self.__entries.move_to_end(key)
+            return self.__entries[key], True
+
+        self.misses += 1
+        value = create()
+        self.__entries[key] = value
+        while len(self.__entries) > self.size:
+            self.__entries.popitem(last=False)
+        return value, False
+
+    def touch(self, key: K, value: V):
+        """Marks `key` as used, adding it if missing."""
+        self.get_or_create(key, lambda: value)
+
+
+@dataclass(frozen=True)
+class Telemetry:
+    """
+    Timings and cache use of a solve request.
+
+    Attributes:
+        worker (int): Process id of the worker.
+        queue_seconds (float): Time from receiving the request until a worker took it.
+        load_seconds (float): Time spent loading the instance, 0 when cached.
+        build_seconds (float): Time spent building the model and its lower bound, 0 when cached.
+        solve_seconds (float): Wall time of CP-SAT.
+        instance_cached (bool): Whether the instance was in the worker's cache.
+        model_cached (bool): Whether the model was in the worker's cache.
+        solutions (int): Number of improving solutions found.
+    """
+    worker: int
+    queue_seconds: float
+    load_seconds: float
+    build_seconds: float
+    solve_seconds: float
+    instance_cached: bool
+    model_cached: bool
+    solutions: int
+
+
+def instance_payload(file_a: str) -> dict[str, str]:
+    """The `instance` of a solve request sending the contents of the instance files."""
+    payload = {"name": file_a_to_name(file_a)}
+    for suffix in ("a", "b", "wt"):
+        path = file_a if suffix == "a" else other_instance_file_path(file_a, suffix)
+        if suffix != "wt" or os.path.exists(path):
+            with open(path) as f:
+                payload[suffix] = f.read()
+    return payload
+
+
+def instance_key(request: dict) -> str:
+    """Cache key of the instance of a request, paths are keyed by their modification times."""
+    if (path := request.get("path")) is not None:
+        files = [path, other_instance_file_path(path, "b"), other_instance_file_path(path, "wt")]
+        stamps = [str(os.stat(f).st_mtime_ns) if os.path.exists(f) else "-" for f in files]
+        return f"path:{os.path.realpath(path)}:{':'.join(stamps)}"
+
+    instance = request["instance"]
+    digest = hashlib.sha1()
+    for part in ("name", "a", "b", "wt"):
+        digest.update(instance.get(part, "").encode())
+        digest.update(b"\0")
+    return f"payload:{digest.hexdigest()}"
+
+
+def __load(request: dict) -> "Instance":
+    from .load_instance import load_instance, loads_instance
+
+    if (path := request.get("path")) is not None:
+        return load_instance(path)
+    instance = request["instance"]
+    return loads_instance(instance["name"], instance["a"], instance["b"], instance.get("wt"))
+
+
+def __solve_request(
+    request: dict,
+    instances: LruCache[str, "Instance"],
+    models: LruCache[str, tuple["Model", int]],
+    config: DaemonConfig,
+    on_solver: tp.Callable[[tp.Any], bool],
+) -> dict:
+    from ortools.sat.python.cp_model import CpSolver
+    from ortools.sat.sat_parameters_pb2 import SatParameters
+
+    from .bounds import lower_bounds
+    from .model import Model
+    from .solver import Solver
+    from .utils import Timer
+
+    timer = Timer()
+    key = request["key"]
+    ins, instance_cached = instances.get_or_create(key, lambda: __load(request))
+    load_seconds = timer.lap()
+
+    def build() -> tuple[Model, int]:
+        model = Model(ins)
+        return model, lower_bounds(ins).objective(model.objective_type)
+    (model, lower_bound), model_cached = models.get_or_create(key, build)
+    build_seconds = timer.lap()
+
+    cp_solver = CpSolver()
+    cp_solver.parameters = SatParameters(
+        max_time_in_seconds=request.get("time_limit", config.time_limit),
+        num_workers=request.get("workers", config.solver_workers),
+    )
+    if not on_solver(cp_solver):
+        return {"id": request["id"], "status": "CANCELLED"}
+    solved = Solver(cp_solver).solve(model, lower_bound)
+    cancelled = not on_solver(None)
+
+    found = bool(solved.solution_times)
+    status = "OPTIMAL" if found and solved.is_optimal else "CANCELLED" if cancelled else cp_solver.status_name()
+    telemetry = Telemetry(
+        worker=os.getpid(),
+        queue_seconds=request["queue_seconds"],
+        load_seconds=load_seconds,
+        build_seconds=build_seconds,
+        solve_seconds=timer.lap(),
+        instance_cached=instance_cached,
+        model_cached=model_cached,
+        solutions=len(solved.solution_times),
+    )
+    return {
+        "id": request["id"],
+        "name": ins.name,
+        "status": status,
+        "objective": solved.solution.objective if found else None,
+        "bound": solved.best_bound,
+        "solution": solved.solution.dump() if found else None,
+        "telemetry": asdict(telemetry),
+    }
+
+
+def worker_main(conn: Connection, config: DaemonConfig):
+    """
+    Entry point of a worker process. Messages from the daemon are read by a separate thread, so a
+    cancel reaches the CP-SAT solve in progress while the main thread solves.
+    """
+    import ortools.sat.python.cp_model  # noqa: F401, imported before the first request
+    from .model import Model  # noqa: F401
+
+    instances = LruCache[str, "Instance"](config.instance_cache)
+    models = LruCache[str, tuple["Model", int]](config.model_cache)
+    tasks = queue.Queue[dict | None]()
+    lock = threading.Lock()
+    running: dict[str, tp.Any] = {}  # request id -> its CpSolver, None once cancelled
+
+    def stop(request_id: str, solver: tp.Any):
+        """Stops a cancelled solve. `stop_search` is lost before `CpSolver.solve` starts, so repeat it."""
+        while True:
+            with lock:
+                if request_id not in running:
+                    return
+            solver.stop_search()
+            time.sleep(0.05)
+
+    def listen():
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                message = ("stop",)
+            match message:
+                case ("solve", request):
+                    with lock:
+                        running[request["id"]] = True
+                    tasks.put(request)
+                case ("cancel", request_id):
+                    with lock:
+                        solver = running.get(request_id)
+                        if solver is not None:
+                            running[request_id] = None
+                            if solver is not True:
+                                threading.Thread(target=stop, args=(request_id, solver), daemon=True).start()
+                case ("stop",):
+                    tasks.put(None)
+                    return
+    threading.Thread(target=listen, daemon=True).start()
+
+    for path in config.preload:
+        # a broken instance must not keep the worker from starting
+        try:
+            preload = {"id": path, "path": path, "queue_seconds": 0.0}
+            preload["key"] = instance_key(preload)
+            __solve_request(preload, instances, models, config, lambda solver: False)
+        except Exception as e:
+            print(f"Skipping preload of {path}: {type(e).__name__}: {e}", file=sys.stderr, flush=True)
+    conn.send(("ready", os.getpid()))
+
+    while (request := tasks.get()) is not None:
+        def on_solver(solver) -> bool:
+            """Registers the solver of the request, False if the request was cancelled."""
+            with lock:
+                if running.get(request["id"]) is None:
+                    return False
+                if solver is not None:
+                    running[request["id"]] = solver
+                return True
+
+        try:
+            response = __solve_request(request, instances, models, config, on_solver)
+        except Exception as e:
+            response = {"id": request["id"], "error": f"{type(e).__name__}: {e}"}
+        with lock:
+            running.pop(request["id"], None)
+        conn.send(("result", request["key"], response))
+
+
+class Daemon:
+    """
+    Worker pool and request queue of the daemon. Requests wait in a queue until a worker is idle,
+    each worker solves one request at a time.
+    """
+
+    @dataclass
+    class __Pending:
+        request: dict
+        reply: tp.Callable[[dict], None]
+        received: float = field(default_factory=time.perf_counter)
+
+    class __Worker:
+        def __init__(self, context: tp.Any, config: DaemonConfig):
+            self.conn, child = context.Pipe()
+            self.process = context.Process(target=worker_main, args=(child, config), daemon=True)
+            self.process.start()
+            child.close()
+            _, self.pid = self.conn.recv()
+            self.keys = LruCache[str, None](config.instance_cache)  # mirror of the worker's cache
+            self.current: tp.Any = None  # pending request being solved
+
+    def __init__(self, config: DaemonConfig):
+        self.config = config
+        self.__context = mp.get_context("spawn")
+        self.__lock = threading.Lock()
+        self.__queue = deque[tp.Any]()
+        self.__ids = set[str]()
+        self.__stopping = False
+        self.__started = time.perf_counter()
+        self.__served = 0
+        self.__workers = [Daemon.__Worker(self.__context, config) for _ in range(config.workers)]
+        for worker in self.__workers:
+            threading.Thread(target=self.__read_results, args=(worker,), daemon=True).start()
+
+    def submit(self, request: dict, reply: tp.Callable[[dict], None]):
+        """Queues a solve request, `reply` is called with its response from another thread."""
+        request_id = request.get("id")
+        try:
+            assert request_id is not None, "Solve requests need an id"
+            assert ("path" in request) != ("instance" in request), "Solve requests need either a path or an instance"
+            key = instance_key(request)
+        except (AssertionError, KeyError, OSError, ValueError) as e:
+            reply({"id": request_id, "error": str(e)})
+            return
+
+        with self.__lock:
+            if request_id in self.__ids:
+                reply({"id": request_id, "error": f"Request {request_id} is already running"})
+                return
+            self.__ids.add(request_id)
+            self.__queue.append(Daemon.__Pending({**request, "key": key}, reply))
+            self.__dispatch()
+
+    def cancel(self, request_id: str) -> bool:
+        """Cancels a queued or running request, False if there is none with the id."""
+        with self.__lock:
+            for pending in self.__queue:
+                if pending.request["id"] == request_id:
+                    self.__queue.remove(pending)
+                    self.__ids.discard(request_id)
+                    pending.reply({"id": request_id, "status": "CANCELLED"})
+                    return True
+            for worker in self.__workers:
+                if worker.current is not None and worker.current.request["id"] == request_id:
+                    worker.conn.send(("cancel", request_id))
+                    return True
+        return False
+
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                "uptime": time.perf_counter() - self.__started,
+                "served": self.__served,
+                "queued": len(self.__queue),
+                "workers": [
+                    {
+                        "pid": w.pid,
+                        "busy": w.current is not None and w.current.request["id"],
+                        "cached_instances": len(w.keys),
+                    }
+                    for w in self.__workers
+                ],
+            }
+
+    def shutdown(self):
+        with self.__lock:
+            self.__stopping = True
+            for pending in self.__queue:
+                pending.reply({"id": pending.request["id"], "status": "CANCELLED"})
+            self.__queue.clear()
+            for worker in self.__workers:
+                if worker.current is not None:
+                    worker.conn.send(("cancel", worker.current.request["id"]))
+                worker.conn.send(("stop",))
+        for worker in self.__workers:
+            worker.process.join(timeout=10)
+
+    def __dispatch(self):
+        """Sends queued requests to idle workers, preferring one which has the instance cached."""
+        idle = [w for w in self.__workers if w.current is None]
+        while self.__queue and idle:
+            pending = self.__queue.popleft()
+            key = pending.request["key"]
+            worker = next((w for w in idle if key in w.keys), idle[0])
+            idle.remove(worker)
+
+            pending.request["queue_seconds"] = time.perf_counter() - pending.received
+            worker.current = pending
+            worker.keys.touch(key, None)
+            worker.conn.send(("solve", pending.request))
+
+    def __read_results(self, worker: "Daemon.__Worker"):
+        while True:
+            try:
+                _, key, response = worker.conn.recv()
+            except (EOFError, OSError):
+                response = {"error": f"Worker {worker.pid} exited"}
+                if not self.__restart(worker, response):
+                    return
+                continue
+
+            with self.__lock:
+                pending, worker.current = worker.current, None
+                self.__ids.discard(response["id"])
+                self.__served += 1
+                self.__dispatch()
+            pending.reply(response)
+
+    def __restart(self, worker: "Daemon.__Worker", response: dict) -> bool:
+        """Fails the request of a dead worker and replaces the worker, False when stopping."""
+        with self.__lock:
+            pending, worker.current = worker.current, None
+            if pending is not None:
+                self.__ids.discard(pending.request["id"])
+            if self.__stopping:
+                return False
+        if pending is not None:
+            pending.reply({"id": pending.request["id"], **response})
+
+        replacement = Daemon.__Worker(self.__context, self.config)
+        with self.__lock:
+            worker.conn, worker.process, worker.pid = replacement.conn, replacement.process, replacement.pid
+            worker.keys = replacement.keys
+            self.__dispatch()
+        return True
+
+
+class __Handler(socketserver.StreamRequestHandler):
+    daemon: Daemon
+
+    def handle(self):
+        write_lock = threading.Lock()
+        def reply(response: dict):
+            with write_lock:
+                try:
+                    self.wfile.write((json.dumps(response) + "\n").encode())
+                    self.wfile.flush()
+                except (OSError, ValueError):
+                    pass  # the client went away
+
+        submitted = []
+        for line in self.rfile:
+            if not line.strip(): continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                reply({"error": f"Invalid JSON: {e}"})
+                continue
+
+            match request.get("op"):
+                case "solve":
+                    submitted.append(request.get("id"))
+                    self.daemon.submit(request, reply)
+                case "cancel":
+                    reply({"id": request.get("id"), "cancelled": self.daemon.cancel(request.get("id"))})
+                case "stats":
+                    reply(self.daemon.stats())
+                case "shutdown":
+                    reply({"status": "SHUTDOWN"})
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                    return
+                case op:
+                    reply({"error": f"Unknown op: {op}"})
+
+        # the client disconnected, its requests are no longer needed
+        for request_id in submitted:
+            self.daemon.cancel(request_id)
+
+
+class __Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(config: DaemonConfig = DaemonConfig()):
+    """Runs the daemon until a shutdown request or an interrupt, then removes the socket."""
+    if os.path.exists(config.socket_path):
+        os.unlink(config.socket_path)
+
+    daemon = Daemon(config)
+    handler = type("Handler", (__Handler,), {"daemon": daemon})
+    with __Server(config.socket_path, handler) as server:
+        print(f"Listening on {config.socket_path} with {config.workers} workers", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            daemon.shutdown()
+            os.unlink(config.socket_path)
+
+
+class DaemonClient:
+    """
+    Blocking client of the daemon. `solve` waits for its response, `cancel` may be called from
+    another thread or another client while it waits.
+    """
+
+    __ids = itertools.count()
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET):
+        import socket
+
+        self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.__socket.connect(socket_path)
+        self.__file = self.__socket.makefile("rwb")
+        self.__prefix = f"{os.getpid()}-{id(self)}-"
+
+    def close(self):
+        self.__file.close()
+        self.__socket.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def new_id(self) -> str:
+        return self.__prefix + str(next(DaemonClient.__ids))
+
+    def solve(
+        self,
+        path: str | None = None,
+        *,
+        instance: dict[str, str] | None = None,
+        time_limit: float | None = None,
+        workers: int | None = None,
+        request_id: str | None = None,
+    ) -> dict:
+        """Solves an instance given by the path of its `a` file, or by `instance_payload`."""
+        request = {"op": "solve", "id": request_id or self.new_id(), "path": path, "instance": instance,
+                   "time_limit": time_limit, "workers": workers}
+        return self.__request({k: v for k, v in request.items() if v is not None}, request["id"])
+
+    def cancel(self, request_id: str) -> bool:
+        return self.__request({"op": "cancel", "id": request_id})["cancelled"]
+
+    def stats(self) -> dict:
+        return self.__request({"op": "stats"})
+
+    def shutdown(self):
+        self.__request({"op": "shutdown"})
+
+    def __request(self, request: dict, response_id: str | None = None) -> dict:
+        self.__file.write((json.dumps(request) + "\n").encode())
+        self.__file.flush()
+        while line := self.__file.readline():
+            response = json.loads(line)
+            if response_id is None or response.get("id") == response_id:
+                return response
+        raise ConnectionError("The daemon closed the connection")
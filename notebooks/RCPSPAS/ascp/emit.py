@@ -0,0 +1,344 @@
+import time
+import typing as tp
+from dataclasses import dataclass
+
+from . import instance
+from .ir import (
+    Alternative,
+    Cumulative,
+    Makespan,
+    ModelIR,
+    NoOverlap,
+    Precedence,
+    Present,
+    PresenceOr,
+    PresenceSum,
+    WeightedTardiness,
+)
+from .solution import Solution, SolvedActivity
+
+
+Backend = tp.Literal["cp-sat", "cpo", "optalcp"]
+BACKENDS: tuple[Backend, ...] = ("cp-sat", "cpo", "optalcp")
+
+
+@dataclass(frozen=True)
+class IntervalValue:
+    present: bool
+    start: int | None = None
+    end: int | None = None
+
+
+@dataclass(frozen=True)
+class IrResult:
+    """
+    Backend-independent result of solving a `ModelIR`.
+
+    Attributes:
+        backend (Backend): Engine which solved the model.
+        status (str): Solve status as reported by the engine.
+        objective (int | None): Objective of the best solution, None if no solution was found.
+        wall_time (float): Wall time of the solve in seconds, excluding model emission.
+        values (list[IntervalValue]): Value of every IR interval in the best solution.
+    """
+    backend: Backend
+    status: str
+    objective: int | None
+    wall_time: float
+    values: list[IntervalValue]
+
+    def to_solution(self, ins: instance.Instance) -> Solution:
+        """Converts the result of an IR built by `build_ir` to a `Solution` of the instance."""
+        assert self.objective is not None, f"{self.backend} found no solution"
+
+        return Solution(
+            objective=self.objective,
+            activities=[
+                SolvedActivity(
+                    id=a.id,
+                    is_scheduled=value.present,
+                    start_time=value.start if value.present else None,
+                    end_time=value.end if value.present else None,
+                    resource_requirements=a.requirements,
+                )
+                for a, value in zip(ins.activities, self.values)
+            ],
+        )
+
+
+class CpSatEmitter:
+    """Emits a `ModelIR` as an OR-Tools `CpModel`."""
+
+    def __init__(self, ir: ModelIR):
+        from ortools.sat.python.cp_model import CpModel
+
+        self.ir = ir
+        self.model = CpModel()
+        self.model.name = ir.name
+        m = self.model
+
+        self.presence = []
+        self.starts = []
+        self.ends = []
+        self.intervals = []
+        for iv in ir.intervals:
+            presence = m.new_bool_var(f"{iv.name}_present") if iv.optional else m.new_constant(1)
+            start = m.new_int_var(0, ir.horizon, f"{iv.name}_start")
+            if iv.size is None:
+                size = m.new_int_var(0, ir.horizon, f"{iv.name}_size")
+                end = m.new_int_var(0, ir.horizon, f"{iv.name}_end")
+                interval = m.new_optional_interval_var(start, size, end, presence, iv.name)
+            else:
+                interval = m.new_optional_fixed_size_interval_var(start, iv.size, presence, iv.name)
+                end = interval.end_expr()
+
+            self.presence.append(presence)
+            self.starts.append(start)
+            self.ends.append(end)
+            self.intervals.append(interval)
+
+        p = self.presence
+        for c in ir.constraints:
+            match c:
+                case Present(i):
+                    m.add(p[i] == 1)
+                case PresenceOr(target, sources):
+                    m.add_max_equality(p[target], [p[s] for s in sources])
+                case PresenceSum(sources, target):
+                    m.add(sum(p[s] for s in sources) == p[target])
+                case Precedence(before, after, delay):
+                    m.add(self.ends[before] + delay <= self.starts[after]).only_enforce_if(p[before], p[after])
+                case Cumulative(intervals, demands, capacity):
+                    m.add_cumulative([self.intervals[i] for i in intervals], list(demands), capacity)
+                case Alternative(master, options):
+                    m.add(sum(p[o] for o in options) == p[master])
+                    for o in options:
+                        m.add(self.starts[o] == self.starts[master]).only_enforce_if(p[o])
+                        m.add(self.ends[o] == self.ends[master]).only_enforce_if(p[o])
+                case NoOverlap(intervals):
+                    m.add_no_overlap([self.intervals[i] for i in intervals])
+
+        match ir.objective:
+            case Makespan(intervals):
+                self.objective = m.new_int_var(0, ir.horizon, "cmax")
+                for i in intervals:
+                    m.add(self.ends[i] <= self.objective).only_enforce_if(p[i])
+            case WeightedTardiness(terms):
+                tardinesses = []
+                for i, due_date, weight in terms:
+                    tardiness = m.new_int_var(0, ir.horizon, f"tardiness_{i}")
+                    m.add_max_equality(tardiness, [self.ends[i] - due_date, 0])
+                    tardinesses.append(weight * tardiness)
+                self.objective = m.new_int_var(0, sum(w for _, _, w in terms) * ir.horizon, "wt")
+                m.add(self.objective == sum(tardinesses))
+            case None:
+                raise ValueError("ModelIR has no objective")
+        m.minimize(self.objective)
+
+    def solve(self, time_limit: float) -> IrResult:
+        from ortools.sat.python.cp_model import CpSolver, FEASIBLE, OPTIMAL
+        from ortools.sat.sat_parameters_pb2 import SatParameters
+
+        solver = CpSolver()
+        solver.parameters = SatParameters(max_time_in_seconds=time_limit)
+        status = solver.solve(self.model)
+        found = status in (OPTIMAL, FEASIBLE)
+
+        return IrResult(
+            backend="cp-sat",
+            status=solver.status_name(status),
+            objective=int(solver.value(self.objective)) if found else None,
+            wall_time=solver.wall_time,
+            values=[
+                IntervalValue(
+                    present=bool(solver.value(self.presence[i])),
+                    start=int(solver.value(self.starts[i])),
+                    end=int(solver.value(self.ends[i])),
+                ) if found else IntervalValue(False)
+                for i in range(len(self.ir.intervals))
+            ],
+        )
+
+
+class CpoEmitter:
+    """Emits a `ModelIR` as an IBM CP Optimizer `CpoModel` (requires `docplex`)."""
+
+    def __init__(self, ir: ModelIR):
+        from docplex.cp.model import CpoModel
+
+        self.ir = ir
+        self.model = CpoModel(name=ir.name)
+        mdl = self.model
+
+        self.intervals = [
+            mdl.interval_var(name=iv.name, optional=iv.optional, size=iv.size)
+            if iv.size is not None else
+            mdl.interval_var(name=iv.name, optional=iv.optional)
+            for iv in ir.intervals
+        ]
+        x = self.intervals
+
+        for c in ir.constraints:
+            match c:
+                case Present(i):
+                    mdl.add(mdl.presence_of(x[i]) == 1)
+                case PresenceOr(target, sources):
+                    mdl.add(mdl.presence_of(x[target]) == (mdl.sum(mdl.presence_of(x[s]) for s in sources) > 0))
+                case PresenceSum(sources, target):
+                    mdl.add(mdl.sum(mdl.presence_of(x[s]) for s in sources) == mdl.presence_of(x[target]))
+                case Precedence(before, after, delay):
+                    mdl.add(mdl.end_before_start(x[before], x[after], delay))
+                case Cumulative(intervals, demands, capacity):
+                    mdl.add(mdl.sum(mdl.pulse(x[i], d) for i, d in zip(intervals, demands)) <= capacity)
+                case Alternative(master, options):
+                    mdl.add(mdl.alternative(x[master], [x[o] for o in options]))
+                case NoOverlap(intervals):
+                    mdl.add(mdl.no_overlap([x[i] for i in intervals]))
+
+        match ir.objective:
+            case Makespan(intervals):
+                mdl.add(mdl.minimize(mdl.max(mdl.end_of(x[i]) for i in intervals)))
+            case WeightedTardiness(terms):
+                mdl.add(mdl.minimize(mdl.sum(
+                    weight * mdl.max(mdl.end_of(x[i]) - due_date, 0) for i, due_date, weight in terms
+                )))
+            case None:
+                raise ValueError("ModelIR has no objective")
+
+    def solve(self, time_limit: float) -> IrResult:
+        result = self.model.solve(TimeLimit=time_limit, LogVerbosity="Quiet")
+        found = bool(result and result.is_solution())
+
+        def value(i: int) -> IntervalValue:
+            if not found: return IntervalValue(False)
+            sol = result.get_var_solution(self.intervals[i])
+            if not sol or not sol.is_present(): return IntervalValue(False)
+            return IntervalValue(True, sol.get_start(), sol.get_end())
+
+        return IrResult(
+            backend="cpo",
+            status=result.get_solve_status(),
+            objective=int(result.get_objective_values()[0]) if found else None,
+            wall_time=result.get_solve_time(),
+            values=[value(i) for i in range(len(self.ir.intervals))],
+        )
+
+
+class OptalCpEmitter:
+    """Emits a `ModelIR` as an OptalCP `Model` (requires `optalcp`)."""
+
+    def __init__(self, ir: ModelIR):
+        import optalcp as cp
+
+        self.ir = ir
+        self.model = cp.Model(name=ir.name)
+        mdl = self.model
+
+        self.intervals = [
+            mdl.interval_var(name=iv.name, optional=iv.optional, length=iv.size)
+            if iv.size is not None else
+            mdl.interval_var(name=iv.name, optional=iv.optional)
+            for iv in ir.intervals
+        ]
+        x = self.intervals
+
+        for c in ir.constraints:
+            match c:
+                case Present(i):
+                    mdl.constraint(x[i].presence() == 1)
+                case PresenceOr(target, sources):
+                    mdl.constraint(x[target].presence() == (sum(x[s].presence() for s in sources) > 0))
+                case PresenceSum(sources, target):
+                    mdl.constraint(sum(x[s].presence() for s in sources) == x[target].presence())
+                case Precedence(before, after, delay):
+                    x[before].end_before_start(x[after], delay)
+                case Cumulative(intervals, demands, capacity):
+                    pulses = [x[i].pulse(height=d) for i, d in zip(intervals, demands)]
+                    mdl.constraint(mdl.cumul_sum(pulses) <= capacity)
+                case Alternative(master, options):
+                    x[master].alternative([x[o] for o in options])
+                case NoOverlap(intervals):
+                    mdl.no_overlap([x[i] for i in intervals])
+
+        match ir.objective:
+            case Makespan(intervals):
+                mdl.minimize(mdl.max([x[i].end() for i in intervals]))
+            case WeightedTardiness(terms):
+                mdl.minimize(mdl.sum([
+                    weight * mdl.max2(x[i].end() - due_date, 0) for i, due_date, weight in terms
+                ]))
+            case None:
+                raise ValueError("ModelIR has no objective")
+
+    def solve(self, time_limit: float) -> IrResult:
+        import optalcp as cp
+
+        result = cp.solve(self.model, cp.Parameters(timeLimit=time_limit))
+        sol = result.best_solution
+
+        def value(i: int) -> IntervalValue:
+            if sol is None or not sol.is_present(self.intervals[i]): return IntervalValue(False)
+            return IntervalValue(True, sol.get_start(self.intervals[i]), sol.get_end(self.intervals[i]))
+
+        return IrResult(
+            backend="optalcp",
+            status="FEASIBLE" if sol is not None else "NO_SOLUTION",
+            objective=int(sol.get_objective()) if sol is not None else None,
+            wall_time=result.duration,
+            values=[value(i) for i in range(len(self.ir.intervals))],
+        )
+
+
+Emitter = CpSatEmitter | CpoEmitter | OptalCpEmitter
+
+
+def emit(ir: ModelIR, backend: Backend) -> Emitter:
+    match backend:
+        case "cp-sat": return CpSatEmitter(ir)
+        case "cpo": return CpoEmitter(ir)
+        case "optalcp": return OptalCpEmitter(ir)
+        case _: raise ValueError(f"Invalid backend: {backend}")
+
+
+@dataclass(frozen=True)
+class BenchmarkRun:
+    """
+    Run of one backend in `benchmark`.
+
+    Attributes:
+        backend (Backend): The backend.
+        result (IrResult | None): Result of the solve, None if the backend failed.
+        emit_time (float): Time spent emitting the model in seconds.
+        error (str | None): Why the backend failed, e.g. a missing engine binary.
+    """
+    backend: Backend
+    result: IrResult | None
+    emit_time: float
+    error: str | None = None
+
+
+def benchmark(ir: ModelIR, backends: tp.Iterable[Backend] = BACKENDS, time_limit: float = 60) -> list[BenchmarkRun]:
+    """
+    Solves the same IR with every backend. Backends whose package is not installed are skipped,
+    backends which fail to emit or solve the model are recorded with their error, so one failing
+    engine does not lose the runs of the others.
+    """
+    runs = []
+    for backend in backends:
+        start = time.perf_counter()
+        try:
+            emitter = emit(ir, backend)
+        except ImportError:
+            print(f"Skipping {backend}, its package is not installed")
+            continue
+        except Exception as e:
+            runs.append(BenchmarkRun(backend, None, time.perf_counter() - start, f"{type(e).__name__}: {e}"))
+            continue
+        emit_time = time.perf_counter() - start
+
+        try:
+            runs.append(BenchmarkRun(backend, emitter.solve(time_limit), emit_time))
+        except Exception as e:
+            runs.append(BenchmarkRun(backend, None, emit_time, f"{type(e).__name__}: {e}"))
+
+    return runs
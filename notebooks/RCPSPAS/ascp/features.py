@@ -0,0 +1,160 @@
+import math
+from dataclasses import asdict, dataclass, fields
+
+import numpy as np
+
+from . import instance
+from .compact_instance import CompactActivities
+
+
+@dataclass(frozen=True)
+class InstanceFeatures:
+    """
+    Numeric description of an instance used to predict how hard it is to solve. Parameters which
+    the instance does not define (e.g. `WtParams` of an ASLIB instance) are NaN.
+
+    Attributes:
+        activity_count (int): Number of activities, including dummy ones.
+        resource_count (int): Number of renewable resources.
+        subgraph_count (int): Number of alternative subgraphs.
+        branch_count (int): Number of non-root branches.
+        precedence_density (float): Precedences divided by the number of activity pairs.
+        mean_successors (float): Average number of successors of an activity.
+        longest_path (int): Length of the longest precedence path over all activities.
+        resource_factor (float): Fraction of (activity, resource) pairs with a nonzero demand.
+        resource_tightness (float): Mean over resources of the total demand-duration product
+            divided by `capacity * longest_path`. Values above 1 force resource conflicts.
+        max_demand_ratio (float): Largest single demand relative to the resource capacity.
+        optional_fraction (float): Fraction of activities outside the root branch.
+        linked_fraction (float): Fraction of activities belonging to more than one branch.
+        mean_branches (float): Average number of branches of a subgraph.
+        max_nesting (int): Maximal nesting depth of subgraphs, 0 if there are none.
+        flex (float): `AlternativeStructureParams.flex` of ASLIB instances.
+        nested (float): `AlternativeStructureParams.nested` of ASLIB instances.
+        linked (float): `AlternativeStructureParams.linked` of ASLIB instances.
+        jobs_in_instance (float): `WtParams.jobs_in_instance` of WT instances.
+        instance_start_lag (float): `WtParams.instance_start_lag` of WT instances.
+        resource_overlap (float): `WtParams.resource_overlap` of WT instances.
+        due_date_tightness (float): Mean due date of WT instances relative to `longest_path`.
+    """
+    activity_count: int
+    resource_count: int
+    subgraph_count: int
+    branch_count: int
+    precedence_density: float
+    mean_successors: float
+    longest_path: int
+    resource_factor: float
+    resource_tightness: float
+    max_demand_ratio: float
+    optional_fraction: float
+    linked_fraction: float
+    mean_branches: float
+    max_nesting: int
+    flex: float = math.nan
+    nested: float = math.nan
+    linked: float = math.nan
+    jobs_in_instance: float = math.nan
+    instance_start_lag: float = math.nan
+    resource_overlap: float = math.nan
+    due_date_tightness: float = math.nan
+
+    @staticmethod
+    def labels() -> tuple[str, ...]:
+        return tuple(f.name for f in fields(InstanceFeatures))
+
+    def values(self) -> np.ndarray:
+        return np.array([getattr(self, f.name) for f in fields(self)], np.float64)
+
+    def asdict(self) -> dict[str, float]:
+        return asdict(self)
+
+    @classmethod
+    def fromdict(cls, d: dict[str, float]) -> "InstanceFeatures":
+        return cls(**{f.name: d[f.name] for f in fields(cls) if f.name in d})
+
+
+def __longest_path(acts: CompactActivities) -> int:
+    """Longest path over all activities, with the precedence graph processed in topological order."""
+    sources, targets = acts.edges()
+    in_degree = np.bincount(targets, minlength=len(acts))
+    finish = acts.durations.copy()
+
+    ready = np.flatnonzero(in_degree == 0).tolist()
+    while ready:
+        a = ready.pop()
+        successors = acts.successor_ids(a)
+        if not len(successors): continue
+
+        starts = np.maximum(finish[successors] - acts.durations[successors], finish[a])
+        finish[successors] = starts + acts.durations[successors]
+        in_degree[successors] -= 1
+        ready.extend(successors[in_degree[successors] == 0].tolist())
+
+    return int(finish.max(initial=0))
+
+
+def __max_nesting(ins: instance.Instance) -> int:
+    subgraph_of = {b: sg for sg in ins.subgraphs for b in sg.branches}
+    depth: dict[int, int] = {}
+
+    def depth_of(sg: instance.Subgraph) -> int:
+        if sg.id not in depth:
+            parents = [subgraph_of[b] for b in ins.activities[sg.principal_activity].branches if b != 0]
+            depth[sg.id] = 1 + max((depth_of(p) for p in parents), default=0)
+        return depth[sg.id]
+
+    return max((depth_of(sg) for sg in ins.subgraphs), default=0)
+
+
+def extract_features(ins: instance.Instance) -> InstanceFeatures:
+    """
+    Computes the `InstanceFeatures` of an instance. Works on both list and `CompactActivities`
+    backed instances, and takes milliseconds even for instances with thousands of activities.
+    """
+    acts = CompactActivities.from_activities(ins.activities)
+    n = len(acts)
+    capacities = np.array(ins.resources, np.float64)
+    requirements = acts.requirements.astype(np.float64)
+    branch_sizes = np.diff(acts.branch_indptr)
+    in_root = np.zeros(n, bool)
+    in_root[np.repeat(np.arange(n), branch_sizes)[acts.branch_indices == 0]] = True
+
+    longest_path = __longest_path(acts)
+    energy = (requirements * acts.durations[:, None]).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tightness = energy / (capacities * max(longest_path, 1))
+        demand_ratio = requirements / capacities
+
+    features = dict(
+        activity_count=n,
+        resource_count=len(ins.resources),
+        subgraph_count=len(ins.subgraphs),
+        branch_count=sum(len(sg.branches) for sg in ins.subgraphs),
+        precedence_density=len(acts.successor_indices) / max(1, n * (n - 1) // 2),
+        mean_successors=len(acts.successor_indices) / max(1, n),
+        longest_path=longest_path,
+        resource_factor=float((requirements > 0).mean()) if requirements.size else 0.0,
+        resource_tightness=float(np.nanmean(tightness)) if len(capacities) else 0.0,
+        max_demand_ratio=float(np.nanmax(demand_ratio, initial=0.0)),
+        optional_fraction=float((~in_root).mean()) if n else 0.0,
+        linked_fraction=float((branch_sizes > 1).mean()) if n else 0.0,
+        mean_branches=float(np.mean([len(sg.branches) for sg in ins.subgraphs])) if ins.subgraphs else 0.0,
+        max_nesting=__max_nesting(ins),
+    )
+
+    match ins:
+        case instance.AslibInstance(params=params):
+            features.update(flex=params.flex, nested=params.nested, linked=params.linked)
+        case instance.WtInstance(params=params, due_dates=due_dates):
+            features.update(
+                jobs_in_instance=params.jobs_in_instance,
+                instance_start_lag=params.instance_start_lag,
+                resource_overlap=params.resource_overlap,
+                due_date_tightness=(
+                    float(np.mean([dd.due_date for dd in due_dates.values()])) / max(longest_path, 1)
+                    if due_dates else math.nan
+                ),
+            )
+
+    return InstanceFeatures(**features)
@@ -0,0 +1,331 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from .instance import (
+    Activity,
+    AlternativeStructureParams,
+    AslibInstance,
+    Instance,
+    RawInstance,
+    RawSubgraph,
+    WtDueDate,
+    WtInstance,
+    WtParams,
+)
+from .load_instance import reconstruct_instance
+from .write_instance import write_instance
+
+
+@dataclass
+class GeneratorConfig:
+    """
+    Size and shape of generated instances.
+
+    Attributes:
+        activity_count (int): Number of activities of an ASLIB instance, including the source and
+            sink. For WT instances, `WtParams.activities_in_job` is used instead.
+        resource_count (int): Number of renewable resources.
+        capacity_range (tuple[int, int]): Inclusive range of resource capacities.
+        duration_range (tuple[int, int]): Inclusive range of activity durations.
+        resource_density (float): Probability that an activity requires a given resource.
+        branch_range (tuple[int, int]): Inclusive range of the number of branches of a subgraph.
+        max_parallel (int): Maximal number of parallel activities in a layer.
+        max_depth (int): Maximal nesting depth of subgraphs.
+        due_date_tightness (float): Due date of a WT job relative to its length, see
+            `generate_wt_instance`. Below 1, even a job scheduled alone is late.
+    """
+    activity_count: int = 122
+    resource_count: int = 5
+    capacity_range: tuple[int, int] = (10, 10)
+    duration_range: tuple[int, int] = (1, 10)
+    resource_density: float = 0.5
+    branch_range: tuple[int, int] = (2, 5)
+    max_parallel: int = 4
+    max_depth: int = 3
+    due_date_tightness: float = 0.8
+
+
+class __Builder:
+    """
+    Builds a series-parallel project with alternative subgraphs. Activities are created in
+    topological order, every subgraph gets a single branching activity whose successors are the
+    first activities of its branches, and branch activities only ever succeed their own branching
+    activity, which are the invariants checked by `reconstruct_instance`.
+    """
+
+    def __init__(self, rng: random.Random, params: AlternativeStructureParams, config: GeneratorConfig):
+        self.rng = rng
+        self.params = params
+        self.config = config
+        self.capacities = [rng.randint(*config.capacity_range) for _ in range(config.resource_count)]
+
+        self.activities: list[Activity] = []
+        self.subgraphs: list[RawSubgraph] = []
+        self.next_branch = 1
+        # predecessors of every join, grouped by the branch they belong to
+        self.join_branches: dict[int, list[list[int]]] = {}
+
+    def new_activity(self, branches: set[int], resources: list[int], dummy: bool = False) -> int:
+        rng = self.rng
+        requirements = [0] * self.config.resource_count
+        if not dummy:
+            for r in resources:
+                if rng.random() < self.config.resource_density:
+                    requirements[r] = rng.randint(1, max(1, self.capacities[r] // 2))
+
+        activity = Activity(
+            id=len(self.activities),
+            duration=0 if dummy else rng.randint(*self.config.duration_range),
+            successors=set(),
+            branches=set(branches),
+            requirements=requirements,
+        )
+        self.activities.append(activity)
+        return activity.id
+
+    def link(self, activities: list[int], successor: int):
+        for a in activities:
+            self.activities[a].successors.add(successor)
+
+    def sequence(self, frontier: list[int], branches: set[int], budget: int, depth: int, resources: list[int]) -> list[int]:
+        """Appends `budget` activities after `frontier` and returns the new frontier."""
+        rng = self.rng
+        min_branches, max_branches = self.config.branch_range
+        alternative_probability = self.params.flex if depth == 0 else self.params.nested
+
+        while budget > 0:
+            can_branch = depth < self.config.max_depth and budget >= min_branches + 2
+            if can_branch and rng.random() < alternative_probability:
+                frontier, used = self.subgraph(frontier, branches, budget, depth, resources)
+            else:
+                frontier, used = self.layer(frontier, branches, budget, resources)
+            budget -= used
+
+        return frontier
+
+    def layer(self, frontier: list[int], branches: set[int], budget: int, resources: list[int]) -> tuple[list[int], int]:
+        rng = self.rng
+        width = rng.randint(1, min(self.config.max_parallel, budget))
+        layer = [self.new_activity(branches, resources) for _ in range(width)]
+
+        # every frontier activity gets a successor and every new activity a predecessor
+        for i, a in enumerate(frontier):
+            self.link([a], layer[i % width])
+        for i, a in enumerate(layer):
+            if i >= len(frontier):
+                self.link([rng.choice(frontier)], a)
+
+        return layer, width
+
+    def subgraph(self, frontier: list[int], branches: set[int], budget: int, depth: int, resources: list[int]) -> tuple[list[int], int]:
+        rng = self.rng
+        min_branches, max_branches = self.config.branch_range
+        branch_count = rng.randint(min_branches, min(max_branches, budget - 2))
+
+        principal = self.new_activity(branches, resources)
+        self.link(frontier, principal)
+
+        branch_ids = list(range(self.next_branch, self.next_branch + branch_count))
+        self.next_branch += branch_count
+        self.subgraphs.append(RawSubgraph(len(self.subgraphs), set(branch_ids)))
+
+        inner_budget = rng.randint(branch_count, max(branch_count, (budget - 2) // 2))
+        cuts = sorted(rng.sample(range(1, inner_budget), branch_count - 1))
+        branch_budgets = [b - a for a, b in zip([0, *cuts], [*cuts, inner_budget])]
+
+        exits: list[list[int]] = []
+        for branch, branch_budget in zip(branch_ids, branch_budgets):
+            head = self.new_activity({branch}, resources)
+            self.link([principal], head)
+            exits.append(self.sequence([head], {branch}, branch_budget - 1, depth + 1, resources))
+
+        used = 2 + inner_budget
+        join_predecessors = [a for branch_exits in exits for a in branch_exits]
+        branch_predecessors = [list(branch_exits) for branch_exits in exits]
+        if used < budget and rng.random() < self.params.linked:
+            first, second = rng.sample(range(branch_count), 2)
+            linked = self.new_activity({branch_ids[first], branch_ids[second]}, resources)
+            self.link([rng.choice(exits[first]), rng.choice(exits[second])], linked)
+            join_predecessors.append(linked)
+            branch_predecessors[first].append(linked)
+            branch_predecessors[second].append(linked)
+            used += 1
+
+        join = self.new_activity(branches, resources)
+        self.link(join_predecessors, join)
+        self.join_branches[join] = branch_predecessors
+
+        return [join], used
+
+    def project(self, activity_count: int, resources: list[int], release: int = 0) -> tuple[int, int]:
+        """Generates a project with a single source and sink, returns their IDs."""
+        assert activity_count >= 2, "A project needs at least a source and a sink activity"
+
+        source = self.new_activity({0}, resources, dummy=True)
+        self.activities[source].duration = release
+
+        frontier = self.sequence([source], {0}, activity_count - 2, 0, resources)
+        sink = self.new_activity({0}, resources, dummy=True)
+        self.link(frontier, sink)
+
+        return source, sink
+
+    def instance(self, name: str) -> Instance:
+        raw = RawInstance(
+            resources=self.capacities,
+            activities=self.activities,
+            subgraphs=self.subgraphs,
+            name=name,
+        )
+        return reconstruct_instance(raw)
+
+
+def generate_aslib_instance(
+    name: str,
+    params: AlternativeStructureParams,
+    config: GeneratorConfig = GeneratorConfig(),
+    seed: int | str | None = None,
+) -> AslibInstance:
+    builder = __Builder(random.Random(seed), params, config)
+    builder.project(config.activity_count, list(range(config.resource_count)))
+    return AslibInstance.from_instance(builder.instance(name), params)
+
+
+def __longest_path(activities: list[Activity], source: int, sink: int) -> int:
+    finish = {source: activities[source].duration}
+    for a in activities[source:sink + 1]:
+        start = finish.get(a.id, 0)
+        for s in a.successors:
+            finish[s] = max(finish.get(s, 0), start + activities[s].duration)
+    return finish[sink]
+
+
+def __shortest_branch_path(activities: list[Activity], join_branches: dict[int, list[list[int]]], source: int, sink: int) -> int:
+    """Longest path from the source to the sink when every subgraph takes its shortest branch."""
+    predecessors: dict[int, list[int]] = {}
+    for a in activities[source:sink + 1]:
+        for s in a.successors:
+            predecessors.setdefault(s, []).append(a.id)
+
+    # activities are created in topological order
+    finish: dict[int, int] = {}
+    for a in activities[source:sink + 1]:
+        if a.id in join_branches:
+            start = min(max(finish[p] for p in group) for group in join_branches[a.id])
+        else:
+            start = max((finish[p] for p in predecessors.get(a.id, [])), default=0)
+        finish[a.id] = start + a.duration
+    return finish[sink]
+
+
+def __mandatory_energy(activities: list[Activity], capacities: list[int], source: int, sink: int) -> int:
+    """Time the activities scheduled in every solution need at least on their busiest resource."""
+    mandatory = [a for a in activities[source + 1:sink] if a.branches == {0}]
+    return max(
+        (-(-sum(a.duration * a.requirements[r] for a in mandatory) // capacity) for r, capacity in enumerate(capacities)),
+        default=0,
+    )
+
+
+def generate_wt_instance(
+    name: str,
+    params: WtParams,
+    structure: AlternativeStructureParams,
+    config: GeneratorConfig = GeneratorConfig(),
+    seed: int | str | None = None,
+) -> WtInstance:
+    """
+    Generates a weighted tardiness instance of `params.jobs_in_instance` independent projects.
+    A `params.resource_overlap` fraction of resources is shared by all jobs, the rest is split
+    between them. Job `j` is released at `j * instance_start_lag` times the length of the previous
+    job, which is modelled by the duration of its source activity.
+
+    The length of a job is the longer of its critical path through the shortest branches and the
+    energy of its mandatory activities on their busiest resource, so it is a lower bound of the job
+    scheduled alone. Its sink is due `config.due_date_tightness` times its length after its release.
+    """
+    rng = random.Random(seed)
+    builder = __Builder(rng, structure, config)
+
+    shared = round(params.resource_overlap * config.resource_count)
+    all_resources = list(range(config.resource_count))
+    rng.shuffle(all_resources)
+    shared_resources, private_resources = all_resources[:shared], all_resources[shared:]
+
+    due_dates: dict[int, WtDueDate] = {}
+    release = 0
+    for job in range(params.jobs_in_instance):
+        resources = shared_resources + private_resources[job::params.jobs_in_instance]
+        source, sink = builder.project(params.activities_in_job, sorted(resources), release)
+
+        shortest = __shortest_branch_path(builder.activities, builder.join_branches, source, sink) - release
+        energy = __mandatory_energy(builder.activities, builder.capacities, source, sink)
+        due_date = release + round(config.due_date_tightness * max(shortest, energy))
+        due_dates[sink] = WtDueDate(due_date=due_date, weight=rng.randint(*params.weight_range))
+
+        job_length = __longest_path(builder.activities, source, sink) - release
+        release = round((job + 1) * params.instance_start_lag * job_length)
+
+    return WtInstance.from_instance(builder.instance(name), due_dates, params)
+
+
+@dataclass(frozen=True)
+class __CorpusTask:
+    directory: str
+    name: str
+    seed: str
+    structure: AlternativeStructureParams
+    wt: WtParams | None
+    config: GeneratorConfig
+    overwrite: bool
+
+
+def __generate_and_write(task: __CorpusTask) -> str:
+    if task.wt is None:
+        ins = generate_aslib_instance(task.name, task.structure, task.config, task.seed)
+    else:
+        ins = generate_wt_instance(task.name, task.wt, task.structure, task.config, task.seed)
+
+    file_a = os.path.join(task.directory, f"{task.name}a.RCP")
+    write_instance(ins, file_a, overwrite=task.overwrite)
+    return file_a
+
+
+def generate_corpus(
+    directory: str | Path,
+    count: int,
+    structure: AlternativeStructureParams,
+    config: GeneratorConfig = GeneratorConfig(),
+    *,
+    wt: WtParams | None = None,
+    seed: int = 0,
+    prefix: str = "gen",
+    processes: int | None = 1,
+    overwrite: bool = False,
+) -> list[str]:
+    """
+    Generates `count` instances into `directory` and returns the paths of their `a` files. Every
+    instance is seeded from `seed` and its index, so the corpus does not depend on `processes`.
+    Pass `processes=None` to use all CPUs.
+    """
+    tasks = [
+        __CorpusTask(
+            directory=str(directory),
+            name=f"{prefix}{i}",
+            seed=f"{seed}:{i}",
+            structure=structure,
+            wt=wt,
+            config=config,
+            overwrite=overwrite,
+        )
+        for i in range(count)
+    ]
+
+    if processes == 1:
+        return list(map(__generate_and_write, tasks))
+
+    with ProcessPoolExecutor(processes) as executor:
+        return list(executor.map(__generate_and_write, tasks, chunksize=max(1, count // 64)))
@@ -3,7 +3,9 @@ import typing as Tp
 from contextlib import contextmanager
 
 from ascp.instance import Activity, Instance, RawInstance, Subgraph, WtInstance
-from ascp.solver import Solution
+
+if Tp.TYPE_CHECKING:
+    from ascp.solution import Solution
 
 
 class __DotPrinter:
@@ -39,7 +41,7 @@ class __DotPrinter:
 
 def show_instance(
     instance: RawInstance | Instance,
-    solution: Tp.Optional[Solution] = None,
+    solution: Tp.Optional["Solution"] = None,
     *,
     file=sys.stdout
 ):
@@ -0,0 +1,188 @@
+import typing as tp
+import weakref
+from dataclasses import dataclass, field
+
+from . import instance
+
+
+@dataclass(frozen=True)
+class Interval:
+    """
+    Interval variable. `size` None means the size is not fixed, e.g. for the master interval of
+    an `Alternative`.
+    """
+    id: int
+    name: str
+    size: int | None
+    optional: bool = False
+
+
+@dataclass(frozen=True)
+class Present:
+    """The interval must be present."""
+    interval: int
+
+
+@dataclass(frozen=True)
+class PresenceOr:
+    """`target` is present iff at least one of `sources` is present."""
+    target: int
+    sources: tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class PresenceSum:
+    """The number of present `sources` equals the presence of `target` (0 or 1)."""
+    sources: tuple[int, ...]
+    target: int
+
+
+@dataclass(frozen=True)
+class Precedence:
+    """If both intervals are present, `after` starts at least `delay` after `before` ends."""
+    before: int
+    after: int
+    delay: int = 0
+
+
+@dataclass(frozen=True)
+class Cumulative:
+    """Sum of pulses of present `intervals` with heights `demands` never exceeds `capacity`."""
+    intervals: tuple[int, ...]
+    demands: tuple[int, ...]
+    capacity: int
+
+
+@dataclass(frozen=True)
+class Alternative:
+    """Exactly one of `options` is present iff `master` is, and it is synchronized with `master`."""
+    master: int
+    options: tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class NoOverlap:
+    intervals: tuple[int, ...]
+
+
+Constraint = Present | PresenceOr | PresenceSum | Precedence | Cumulative | Alternative | NoOverlap
+
+
+@dataclass(frozen=True)
+class Makespan:
+    """Minimize the maximal end of the present `intervals`."""
+    intervals: tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class WeightedTardiness:
+    """Minimize the sum of `weight * max(0, end - due_date)` over `(interval, due_date, weight)`."""
+    terms: tuple[tuple[int, int, int], ...]
+
+
+Objective = Makespan | WeightedTardiness
+
+
+@dataclass
+class ModelIR:
+    """
+    Backend-neutral scheduling model: a list of interval variables, constraints over them and an
+    objective. `ascp.emit` turns it into an OR-Tools CP-SAT, IBM CP Optimizer or OptalCP model.
+    """
+    name: str
+    horizon: int
+    intervals: list[Interval] = field(default_factory=list)
+    constraints: list[Constraint] = field(default_factory=list)
+    objective: Objective | None = None
+
+    def interval(self, name: str, size: int | None, optional: bool = False) -> int:
+        interval = Interval(id=len(self.intervals), name=name, size=size, optional=optional)
+        self.intervals.append(interval)
+        return interval.id
+
+    def add(self, constraint: Constraint):
+        self.constraints.append(constraint)
+
+    def constraints_of[C](self, kind: type[C]) -> list[C]:
+        return [c for c in self.constraints if isinstance(c, kind)]
+
+
+def __branch_heads(ins: instance.Instance) -> dict[int, int]:
+    """Maps every non-root branch to the first activity of that branch."""
+    heads: dict[int, int] = {}
+    for sg in ins.subgraphs:
+        for s in ins.activities[sg.principal_activity].successors:
+            branches = ins.activities[s].branches
+            if len(branches) == 1 and branches <= sg.branches:
+                heads[next(iter(branches))] = s
+    return heads
+
+
+def __ascp_ir(ins: instance.Instance, objective: tp.Literal["cmax", "wt"]) -> ModelIR:
+    ir = ModelIR(name=ins.name, horizon=sum(a.duration for a in ins.activities))
+
+    for a in ins.activities:
+        always_present = 0 in a.branches
+        ir.interval(f"activity_{a.id}", a.duration, optional=not always_present)
+
+    heads = __branch_heads(ins)
+    for a in ins.activities:
+        if 0 in a.branches:
+            ir.add(Present(a.id))
+            continue
+
+        sources = tuple(sorted(heads[b] for b in a.branches))
+        if sources != (a.id,):
+            ir.add(PresenceOr(a.id, sources))
+
+    for sg in ins.subgraphs:
+        ir.add(PresenceSum(tuple(sorted(heads[b] for b in sg.branches)), sg.principal_activity))
+
+    for a in ins.activities:
+        for s in sorted(a.successors):
+            ir.add(Precedence(a.id, s))
+
+    for r, capacity in enumerate(ins.resources):
+        users = [a for a in ins.activities if a.requirements[r] > 0]
+        if not users: continue
+        ir.add(Cumulative(
+            intervals=tuple(a.id for a in users),
+            demands=tuple(a.requirements[r] for a in users),
+            capacity=capacity,
+        ))
+
+    match objective:
+        case "cmax":
+            ir.objective = Makespan(tuple(a.id for a in ins.activities))
+        case "wt":
+            assert isinstance(ins, instance.WtInstance), "wt objective can only be used with WtInstance instances"
+            ir.objective = WeightedTardiness(tuple(
+                (a, dd.due_date, dd.weight) for a, dd in sorted(ins.due_dates.items())
+            ))
+        case _:
+            raise ValueError(f"Invalid objective: {objective}")
+
+    return ir
+
+
+__cache: dict[tuple[int, str], tuple[weakref.ref, ModelIR]] = {}
+
+
+def build_ir(ins: instance.Instance, objective: tp.Literal["cmax", "wt"] | None = None) -> ModelIR:
+    """
+    Builds the ASCP model of the instance as a `ModelIR`. Interval `i` is activity `i`. The IR is
+    cached per instance object, so emitting it to several backends builds it only once. The
+    returned IR is shared and must not be modified.
+    """
+    if objective is None:
+        objective = "wt" if isinstance(ins, instance.WtInstance) else "cmax"
+
+    key = (id(ins), objective)
+    if key in __cache:
+        ref, ir = __cache[key]
+        if ref() is ins:
+            return ir
+
+    ir = __ascp_ir(ins, objective)
+    __cache[key] = (weakref.ref(ins, lambda _: __cache.pop(key, None)), ir)
+    return ir
@@ -2,7 +2,8 @@ import os
 
 
 from collections import deque
-from typing import Callable, Optional
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Callable
 
 from ascp.__shared import other_instance_file_path, file_a_to_name
 
@@ -21,6 +22,13 @@ from .instance import (
     WtParams,
 )
 
+if TYPE_CHECKING:
+    from .profiling import Profiler, Stage
+
+
+def __phase(profiler: "Profiler | None", stage: "Stage"):
+    return profiler.phase(stage, stage) if profiler is not None else nullcontext()
+
 
 def __read_file(file_path: str):
     def lines():
@@ -33,6 +41,12 @@ def __read_file(file_path: str):
     return next_line
 
 
+def __read_text(text: str):
+    ls = (line.strip() for line in text.splitlines() if line.strip())
+    def next_line(): return next(ls)
+    return next_line
+
+
 def __nums[T](line: str, to_num: Callable[[str], T] = int) -> list[T]:
     return list(map(to_num, line.split()))
 
@@ -132,41 +146,45 @@ def __load_instance(read_line_a: __ReadLine, read_line_b: __ReadLine, name: str,
 
 def __load_aslib_instance(
     read_line_a: __ReadLine, read_line_b: __ReadLine,
-    name: str, file_a: str, file_b: str
+    name: str, files: AslibInstanceFiles | None, profiler: "Profiler | None",
 ) -> AslibInstance:
-    [flex, nest, link] = __nums(read_line_b(), float)
-    params = AlternativeStructureParams(flex, nest, link)
-
-    instance = __load_instance(read_line_a, read_line_b, name)
-    instance = reconstruct_instance(instance)
+    with __phase(profiler, "parse"):
+        [flex, nest, link] = __nums(read_line_b(), float)
+        params = AlternativeStructureParams(flex, nest, link)
+        instance = __load_instance(read_line_a, read_line_b, name)
+    with __phase(profiler, "reconstruct"):
+        instance = reconstruct_instance(instance)
 
-    return AslibInstance.from_instance(instance, params, AslibInstanceFiles(file_a, file_b))
+    return AslibInstance.from_instance(instance, params, files)
 
 
 def __load_wt_instance(
     read_line_a: __ReadLine, read_line_b: __ReadLine, read_line_wt: __ReadLine,
-    name: str, file_a: str, file_b: str, file_wt: str
+    name: str, files: WtInstanceFiles | None, profiler: "Profiler | None",
 ) -> WtInstance:
-    params = WtParams.fromstr(read_line_wt())
-    [num_wt] = __nums(read_line_wt())
+    with __phase(profiler, "parse"):
+        params = WtParams.fromstr(read_line_wt())
+        [num_wt] = __nums(read_line_wt())
 
-    due_dates = dict[int, WtDueDate]()
-    for i in range(num_wt):
-        [activity_id, weight, due_date] = __nums(read_line_wt())
-        due_dates[activity_id - 1] = WtDueDate(due_date, weight)
+        due_dates = dict[int, WtDueDate]()
+        for i in range(num_wt):
+            [activity_id, weight, due_date] = __nums(read_line_wt())
+            due_dates[activity_id - 1] = WtDueDate(due_date, weight)
 
-    instance = __load_instance(read_line_a, read_line_b, name, check_sink=False)
-    instance = reconstruct_instance(instance)
+        instance = __load_instance(read_line_a, read_line_b, name, check_sink=False)
+    with __phase(profiler, "reconstruct"):
+        instance = reconstruct_instance(instance)
 
     return WtInstance.from_instance(
         instance,
         due_dates,
         params,
-        WtInstanceFiles(file_a, file_b, file_wt)
+        files,
     )
 
 
-def load_instance(file_a: str) -> WtInstance | AslibInstance:
+def load_instance(file_a: str, profiler: "Profiler | None" = None) -> WtInstance | AslibInstance:
+    """Loads an instance from its `a` file, recording the parse and reconstruct phases to `profiler`."""
     file_b = other_instance_file_path(file_a, "b")
     file_wt = other_instance_file_path(file_a, "wt")
 
@@ -175,10 +193,31 @@ def load_instance(file_a: str) -> WtInstance | AslibInstance:
 
     name = file_a_to_name(file_a)
     if not os.path.exists(file_wt):
-        return __load_aslib_instance(read_line_a, read_line_b, name, file_a, file_b)
+        return __load_aslib_instance(read_line_a, read_line_b, name, AslibInstanceFiles(file_a, file_b), profiler)
     else:
         read_line_wt = __read_file(file_wt)
-        return __load_wt_instance(read_line_a, read_line_b, read_line_wt, name, file_a, file_b, file_wt)
+        files = WtInstanceFiles(file_a, file_b, file_wt)
+        return __load_wt_instance(read_line_a, read_line_b, read_line_wt, name, files, profiler)
+
+
+def loads_instance(
+    name: str,
+    text_a: str,
+    text_b: str,
+    text_wt: str | None = None,
+    profiler: "Profiler | None" = None,
+) -> WtInstance | AslibInstance:
+    """
+    Loads an instance from the contents of its `a`, `b` and optional `wt` files, e.g. received
+    over a socket. The instance has no `files`.
+    """
+    read_line_a = __read_text(text_a)
+    read_line_b = __read_text(text_b)
+
+    if text_wt is None:
+        return __load_aslib_instance(read_line_a, read_line_b, name, None, profiler)
+    else:
+        return __load_wt_instance(read_line_a, read_line_b, __read_text(text_wt), name, None, profiler)
 
 
 def __all_disjoint[T](*sets: set[T]) -> bool:
@@ -197,23 +236,25 @@ def __union[T](*sets: set[T]) -> set[T]:
     return set().union(*sets)
 
 
-def __index_where[T](lst: list[T], predicate: Callable[[T], bool]) -> Optional[int]:
-    for i, item in enumerate(lst):
-        if predicate(item):
-            return i
+def __subgraph_activities(instance: RawInstance) -> list[set[int]]:
+    subgraph_of_branch = { b: sg.id for sg in instance.subgraphs for b in sg.branches }
+    activities: list[set[int]] = [set() for _ in instance.subgraphs]
+
+    for a in instance.activities:
+        for b in a.branches:
+            if b in subgraph_of_branch:
+                activities[subgraph_of_branch[b]].add(a.id)
 
-    return None
+    return activities
 
 
 def __check_branching_activity_precedes_whole_subgraph(
     instance: RawInstance,
     branching_activity: int,
-    subgraph: RawSubgraph
+    subgraph: RawSubgraph,
+    required_activities: set[int],
 ):
-    required_activities = {
-        a.id for a in instance.activities
-        if a.branches.intersection(subgraph.branches)
-    }
+    required_activities = set(required_activities)
 
     err_message = lambda: f"Branching activity {branching_activity} must not be in subgraph {subgraph.id}"
     assert branching_activity not in required_activities, err_message()
@@ -236,6 +277,7 @@ def __check_branching_activity_precedes_whole_subgraph(
 
 def reconstruct_instance(instance: RawInstance):
     branching_activities: list[int | None] = [None for _ in instance.subgraphs]
+    subgraph_by_branches = { frozenset(sg.branches): i for i, sg in enumerate(instance.subgraphs) }
 
     for activity in instance.activities:
         successor_branchsets = [instance.activities[s].branches for s in activity.successors]
@@ -243,7 +285,7 @@ def reconstruct_instance(instance: RawInstance):
         if not __all_disjoint(*successor_branchsets): continue
 
         successor_branchset = __union(*successor_branchsets)
-        subgraph = __index_where(instance.subgraphs, lambda s: s.branches == successor_branchset)
+        subgraph = subgraph_by_branches.get(frozenset(successor_branchset))
         if subgraph is None: continue
 
         err_message = lambda old_ba: (
@@ -258,8 +300,9 @@ def reconstruct_instance(instance: RawInstance):
         return a
 
     unwrapped_branching_activities = [unwrap_activity(i, a) for i, a in enumerate(branching_activities)]
+    subgraph_activities = __subgraph_activities(instance)
     for ba, sg in zip(unwrapped_branching_activities, instance.subgraphs):
-        __check_branching_activity_precedes_whole_subgraph(instance, ba, sg)
+        __check_branching_activity_precedes_whole_subgraph(instance, ba, sg, subgraph_activities[sg.id])
 
     return Instance(
         resources=instance.resources,
@@ -1,9 +1,15 @@
 import typing as tp
 from dataclasses import dataclass, field
 
-from ortools.sat.python.cp_model import CpModel, IntervalVar, IntVar, LinearExprT
+from ortools.sat.python.cp_model import Constraint, CpModel, IntervalVar, IntVar, LinearExprT
 
 from . import instance
+from .presolve import ALWAYS, PresenceKey, Presolve, presolve
+from .profiling import Profiler, maybe_phase
+from .redundant import incompatible_cliques, transitive_precedences
+
+if tp.TYPE_CHECKING:
+    from .solution import Solution
 
 
 @dataclass
@@ -15,9 +21,40 @@ class ModelConfig:
         tmin (int): The minimum time value.
         tmax (int | None): The maximum time value. Leaving None calculates upper bound will be
             calculated as sum of all activity durations.
+        presolve (bool): Run the structural presolve (`ascp.presolve`) before creating the model.
+            Always scheduled activities get constant presence and non-optional intervals,
+            activities with identical branch sets share one presence literal and trivially true
+            enforcement literals are left out.
+        no_overlap_cliques (bool): Add `add_no_overlap` over cliques of activities whose demands
+            pairwise exceed the capacity of some resource (redundant).
+        transitive_precedences (bool): Add precedences along paths of implied activities with
+            the accumulated durations as minimum lags (redundant).
+        energetic_bounds (bool): Bound cmax from below by the energy of the scheduled activities
+            on every resource (redundant, cmax objective only).
     """
     tmin: int = 0
     tmax: int | None = None
+    presolve: bool = True
+    no_overlap_cliques: bool = False
+    transitive_precedences: bool = False
+    energetic_bounds: bool = False
+
+
+@dataclass(frozen=True)
+class Reservation:
+    """
+    Capacity of a resource taken over a fixed time span, outside of the activities of the instance.
+
+    Attributes:
+        resource (int): Index of the resource.
+        start (int): Start of the span.
+        end (int): End of the span, exclusive.
+        demand (int): Capacity taken during the span.
+    """
+    resource: int
+    start: int
+    end: int
+    demand: int
 
 
 @dataclass
@@ -35,18 +72,26 @@ class Activity:
 class Model:
     """
     A model for the ASCP problem. This is mostly a wrapper around OR-Tools CpModel which holds all
-    the variables and constraints of the model.
+    the variables and constraints of the model. With a `profiler`, every construction phase is
+    recorded, and `Solver.solve` records the solve to the same profiler. `reservations` take
+    capacity of the resources over fixed time spans, e.g. a capacity which changes over time.
     """
 
     @dataclass
     class __ResolvedConfig:
         tmin: int
         tmax: int
+        no_overlap_cliques: bool
+        transitive_precedences: bool
+        energetic_bounds: bool
 
     def __init__(self,
         problem_instance: instance.Instance,
         objective: tp.Literal["cmax", "wt"] | None = None,
         config: ModelConfig = ModelConfig(),
+        *,
+        profiler: Profiler | None = None,
+        reservations: tp.Iterable[Reservation] = (),
     ):
         if objective is None:
             objective = "wt" if isinstance(problem_instance, instance.WtInstance) else "cmax"
@@ -55,24 +100,49 @@ class Model:
         self.__objective = objective
         self.__model = CpModel()
         self.__model.name = "ASCP"
+        self.profiler = profiler
+        self.__reservations = list(reservations)
 
         self.__config = Model.__ResolvedConfig(
             tmin=config.tmin,
-            tmax=config.tmax or sum(a.duration for a in problem_instance.activities)
+            tmax=config.tmax or sum(a.duration for a in problem_instance.activities),
+            no_overlap_cliques=config.no_overlap_cliques,
+            transitive_precedences=config.transitive_precedences,
+            energetic_bounds=config.energetic_bounds,
         )
 
-        self.__create_activity_variables()
-        self.__create_subgraph_variables()
-
-        match objective:
-            case "cmax": self.__make_cmax()
-            case "wt": self.__make_wt()
-            case _: raise ValueError(f"Invalid objective: {objective}")
-
-        self.__create_activity_scheduled_constraints()
-        self.__create_one_of_subgraph_constraints()
-        self.__create_successor_constraints()
-        self.__create_resource_constraints()
+        with self.__phase("presolve"):
+            self.__presolve = presolve(problem_instance) if config.presolve else None
+
+        with self.__phase("subgraph_variables"):
+            self.__create_subgraph_variables()
+        with self.__phase("activity_variables"):
+            self.__create_activity_variables()
+
+        with self.__phase("objective"):
+            match objective:
+                case "cmax": self.__make_cmax()
+                case "wt": self.__make_wt()
+                case _: raise ValueError(f"Invalid objective: {objective}")
+
+        with self.__phase("activity_scheduled_constraints"):
+            self.__create_activity_scheduled_constraints()
+        with self.__phase("one_of_subgraph_constraints"):
+            self.__create_one_of_subgraph_constraints()
+        with self.__phase("successor_constraints"):
+            self.__create_successor_constraints()
+        with self.__phase("resource_constraints"):
+            self.__create_resource_constraints()
+
+        if self.__config.no_overlap_cliques:
+            with self.__phase("no_overlap_cliques"):
+                self.__create_no_overlap_cliques()
+        if self.__config.transitive_precedences:
+            with self.__phase("transitive_precedences"):
+                self.__create_transitive_precedences()
+        if self.__config.energetic_bounds and objective == "cmax":
+            with self.__phase("energetic_bounds"):
+                self.__create_energetic_bounds()
 
     @property
     def cp_model(self):
@@ -86,6 +156,10 @@ class Model:
     def instance(self) -> instance.Instance:
         return self.__instance
 
+    @property
+    def presolve(self) -> Presolve | None:
+        return self.__presolve
+
     @property
     def objective(self) -> IntVar:
         match self.__objective:
@@ -93,21 +167,80 @@ class Model:
             case "wt": return self.__wt
             case _: raise ValueError(f"Invalid objective: {self.__objective}")
 
+    def add_hint(self, solution: "Solution"):
+        """
+        Hints a schedule of the instance, e.g. the incumbent of an earlier solve, as the solver's
+        starting point. Branch literals are hinted from the scheduled first activities of branches.
+        """
+        hinted: set[int] = set()
+        def hint(var: IntVar, value: int):
+            if var.index not in hinted:
+                hinted.add(var.index)
+                self.__model.add_hint(var, value)
+
+        for activity, solved in zip(self.activities, solution.activities):
+            hint(activity.is_scheduled, int(solved.is_scheduled))
+            if solved.is_scheduled and solved.start_time is not None:
+                hint(activity.start, solved.start_time)
+
+            branches = activity.activity.branches
+            if len(branches) == 1 and 0 not in branches:
+                hint(self.branches[next(iter(branches))], int(solved.is_scheduled))
+
+        hint(self.objective, solution.objective)
+
+    def __phase(self, name: str):
+        return maybe_phase(self.profiler, "build", name, self.__model)
+
     def __new_int_var(self, name: str, *, lb: int | None = None, ub: int | None = None) -> IntVar:
         lb = lb or self.__config.tmin
         ub = ub or self.__config.tmax
         return self.__model.new_int_var(lb, ub, name)
 
+    def __presence_literal(self, key: PresenceKey) -> IntVar:
+        if key == ALWAYS:
+            return self.branches[0]
+        if len(key) == 1:
+            return self.branches[next(iter(key))]
+        return self.__shared_presence[key]
+
+    def __enforce_if_scheduled(self, constraint: Constraint, *activities: Activity):
+        """Enforces the constraint by presence of the activities, leaving out trivially true literals."""
+        if self.__presolve is None:
+            constraint.only_enforce_if(*(a.is_scheduled for a in activities))
+            return
+
+        keys = self.__presolve.enforcement(*(a.activity.id for a in activities))
+        if keys:
+            constraint.only_enforce_if(*(self.__presence_literal(k) for k in keys))
+
     def __create_activity_variables(self):
+        self.__shared_presence: dict[PresenceKey, IntVar] = {}
+
         def create_activity(activity: instance.Activity) -> Activity:
-            is_scheduled = self.__model.new_bool_var(f"activity_{activity.id}_is_scheduled")
             start = self.__new_int_var(f"activity_{activity.id}_start")
-            interval = self.__model.new_optional_fixed_size_interval_var(
-                start,
-                activity.duration,
-                is_present=is_scheduled,
-                name=f"activity_{activity.id}_interval"
-            )
+            key = self.__presolve.presence[activity.id] if self.__presolve else None
+
+            if key is not None and (len(key) <= 1 or key in self.__shared_presence):
+                is_scheduled = self.__presence_literal(key)
+            else:
+                is_scheduled = self.__model.new_bool_var(f"activity_{activity.id}_is_scheduled")
+                if key is not None:
+                    self.__shared_presence[key] = is_scheduled
+
+            if key == ALWAYS:
+                interval = self.__model.new_fixed_size_interval_var(
+                    start,
+                    activity.duration,
+                    name=f"activity_{activity.id}_interval"
+                )
+            else:
+                interval = self.__model.new_optional_fixed_size_interval_var(
+                    start,
+                    activity.duration,
+                    is_present=is_scheduled,
+                    name=f"activity_{activity.id}_interval"
+                )
 
             return Activity(activity, is_scheduled, start, interval)
 
@@ -126,11 +259,8 @@ class Model:
     def __make_cmax(self):
         self.__cmax = self.__new_int_var("cmax")
 
-        for activity in self.activities: (
-            self.__model
-                .add(activity.end <= self.__cmax)
-                .only_enforce_if(activity.is_scheduled)
-        )
+        for activity in self.activities:
+            self.__enforce_if_scheduled(self.__model.add(activity.end <= self.__cmax), activity)
 
         self.__model.minimize(self.__cmax)
 
@@ -151,6 +281,12 @@ class Model:
         self.__model.minimize(self.__wt)
 
     def __create_activity_scheduled_constraints(self):
+        if self.__presolve is not None:
+            # fixed and single branch activities are scheduled by construction
+            for key, is_scheduled in self.__shared_presence.items():
+                self.__model.add_max_equality(is_scheduled, [self.branches[branch] for branch in sorted(key)])
+            return
+
         for activity in self.activities:
             self.__model.add_max_equality(
                 activity.is_scheduled,
@@ -168,9 +304,10 @@ class Model:
         for activity in self.activities:
             for successor_idx in activity.activity.successors:
                 successor = self.activities[successor_idx]
-                (self.__model
-                    .add(activity.interval.end_expr() <= successor.start)
-                    .only_enforce_if(activity.is_scheduled, successor.is_scheduled)
+                self.__enforce_if_scheduled(
+                    self.__model.add(activity.interval.end_expr() <= successor.start),
+                    activity,
+                    successor,
                 )
 
     def __create_resource_constraints(self):
@@ -187,9 +324,41 @@ class Model:
                 resources[resource_idx].intervals.append(activity.interval)
                 resources[resource_idx].demands.append(demand)
 
+        for i, reservation in enumerate(self.__reservations):
+            interval = self.__model.new_fixed_size_interval_var(
+                reservation.start,
+                reservation.end - reservation.start,
+                name=f"resource_{reservation.resource}_reservation_{i}"
+            )
+            resources[reservation.resource].intervals.append(interval)
+            resources[reservation.resource].demands.append(reservation.demand)
+
         for resource in resources:
             self.__model.add_cumulative(
                 intervals=resource.intervals,
                 demands=resource.demands,
                 capacity=resource.capacity
             )
+
+    def __create_no_overlap_cliques(self):
+        for clique in incompatible_cliques(self.__instance):
+            self.__model.add_no_overlap([self.activities[a].interval for a in clique])
+
+    def __create_transitive_precedences(self):
+        for p in transitive_precedences(self.__instance):
+            before, after = self.activities[p.before], self.activities[p.after]
+            self.__enforce_if_scheduled(
+                self.__model.add(before.end + p.lag <= after.start),
+                before,
+                after,
+            )
+
+    def __create_energetic_bounds(self):
+        for resource_idx, capacity in enumerate(self.__instance.resources):
+            energy = [
+                activity.activity.duration * activity.activity.requirements[resource_idx] * activity.is_scheduled
+                for activity in self.activities
+                if activity.activity.duration * activity.activity.requirements[resource_idx] > 0
+            ]
+            if energy:
+                self.__model.add(capacity * (self.__cmax - self.__config.tmin) >= sum(energy))
@@ -0,0 +1,135 @@
+from dataclasses import dataclass
+from functools import cache
+
+from . import instance
+
+
+PresenceKey = frozenset[int]
+"""
+Canonical presence of an activity: the empty set for always scheduled activities, `{b}` for
+activities scheduled exactly when branch `b` is selected, and the branch set of the activity for
+activities shared by several branches.
+"""
+
+ALWAYS: PresenceKey = frozenset()
+
+
+@dataclass(frozen=True)
+class PresolveStats:
+    """
+    Model-size reduction achieved by `presolve`, compared to the unpresolved model which has one
+    presence literal, one `add_max_equality` and one optional interval per activity, and two
+    enforcement literals per precedence.
+
+    Attributes:
+        activities (int): Number of activities.
+        fixed_activities (int): Activities fixed to be scheduled, with a non-optional interval.
+        branch_literal_activities (int): Activities reusing the literal of their single branch.
+        shared_literals (int): Presence literals shared by activities with identical branch sets.
+        precedences (int): Number of precedences.
+        enforcement_literals (int): Enforcement literals of precedences after presolve.
+        unconditional_precedences (int): Precedences between two fixed activities.
+    """
+    activities: int
+    fixed_activities: int
+    branch_literal_activities: int
+    shared_literals: int
+    precedences: int
+    enforcement_literals: int
+    unconditional_precedences: int
+
+    @property
+    def removed_presence_literals(self) -> int:
+        return self.activities - self.shared_literals
+
+    @property
+    def removed_enforcement_literals(self) -> int:
+        return 2 * self.precedences - self.enforcement_literals
+
+    def __str__(self) -> str:
+        return '\n'.join([
+            f"presence literals: {self.activities} -> {self.shared_literals} "
+            f"({self.fixed_activities} fixed, {self.branch_literal_activities} branch literals)",
+            f"optional intervals: {self.activities} -> {self.activities - self.fixed_activities}",
+            f"enforcement literals: {2 * self.precedences} -> {self.enforcement_literals} "
+            f"({self.unconditional_precedences} unconditional precedences)",
+        ])
+
+
+@dataclass(frozen=True)
+class Presolve:
+    """
+    Structural presolve of an instance, computed before the model is created.
+
+    Attributes:
+        presence (list[PresenceKey]): Presence key of every activity.
+        stats (PresolveStats): Size reduction of the model.
+    """
+    presence: list[PresenceKey]
+    stats: PresolveStats
+
+    def enforcement(self, *activities: int) -> list[PresenceKey]:
+        """Non-trivial presence keys enforcing a constraint over the activities, without duplicates."""
+        keys = [self.presence[a] for a in activities]
+        return [k for i, k in enumerate(keys) if k != ALWAYS and k not in keys[:i]]
+
+
+def presolve(ins: instance.Instance) -> Presolve:
+    """
+    Finds the canonical presence of every activity. Activities of the root branch are always
+    scheduled, activities of a single branch are scheduled iff the branch literal is true, and
+    activities with identical branch sets are scheduled together, so they share one literal.
+    """
+    presence = [
+        ALWAYS if 0 in a.branches else frozenset(a.branches)
+        for a in ins.activities
+    ]
+
+    enforcement_literals = 0
+    unconditional = 0
+    precedences = 0
+    for a in ins.activities:
+        for s in a.successors:
+            keys = {presence[a.id], presence[s]} - {ALWAYS}
+            enforcement_literals += len(keys)
+            unconditional += not keys
+            precedences += 1
+
+    stats = PresolveStats(
+        activities=len(presence),
+        fixed_activities=sum(k == ALWAYS for k in presence),
+        branch_literal_activities=sum(len(k) == 1 for k in presence),
+        shared_literals=len({k for k in presence if len(k) > 1}),
+        precedences=precedences,
+        enforcement_literals=enforcement_literals,
+        unconditional_precedences=unconditional,
+    )
+    return Presolve(presence, stats)
+
+
+class Implications:
+    """
+    Answers which activities are scheduled in every solution in which a given branch is selected
+    or a given activity is scheduled. Selecting a branch schedules its branching activity, which
+    in turn selects one of the branches of the branching activity.
+    """
+
+    def __init__(self, ins: instance.Instance):
+        self.__instance = ins
+        self.__principal_of = {b: sg.principal_activity for sg in ins.subgraphs for b in sg.branches}
+        self.__branch_implies = cache(self.__branch_implies_uncached)
+
+    def __branch_implies_uncached(self, branch: int, branches: frozenset[int]) -> bool:
+        if branch in branches or 0 in branches: return True
+        if branch == 0: return False
+        parents = self.__instance.activities[self.__principal_of[branch]].branches
+        return all(self.__branch_implies(p, branches) for p in parents)
+
+    def branch_implies(self, branch: int, activity: int) -> bool:
+        """True if the activity is scheduled whenever the branch is selected."""
+        return self.__branch_implies(branch, frozenset(self.__instance.activities[activity].branches))
+
+    def implies(self, u: int, v: int) -> bool:
+        """True if activity `v` is scheduled whenever activity `u` is."""
+        branches = frozenset(self.__instance.activities[v].branches)
+        return all(self.__branch_implies(b, branches) for b in self.__instance.activities[u].branches)
@@ -0,0 +1,161 @@
+import cProfile
+import io
+import pstats
+import tracemalloc
+import typing as tp
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+
+from .utils import Timer
+
+if tp.TYPE_CHECKING:
+    from ortools.sat.python.cp_model import CpModel
+
+Stage = tp.Literal["parse", "reconstruct", "build", "solve"]
+
+
+@dataclass(frozen=True)
+class PhaseStats:
+    """
+    Measurements of one phase of loading, building or solving an instance.
+
+    Attributes:
+        stage (Stage): Stage the phase belongs to, "parse", "reconstruct", "build" or "solve".
+        name (str): Name of the phase, e.g. "resource_constraints".
+        seconds (float): Wall time of the phase.
+        variables (int): Variables added to the model during the phase.
+        bool_variables (int): Boolean variables among `variables`.
+        constraints (int): Constraints added to the model during the phase.
+        enforcement_literals (int): Enforcement literals of `constraints`.
+        peak_memory (int | None): Peak memory allocated by Python during the phase in bytes,
+            None unless memory is tracked.
+    """
+    stage: Stage
+    name: str
+    seconds: float
+    variables: int = 0
+    bool_variables: int = 0
+    constraints: int = 0
+    enforcement_literals: int = 0
+    peak_memory: int | None = None
+
+
+@dataclass(frozen=True)
+class ProfileReport:
+    """
+    Phases recorded by a `Profiler`, in the order they ran.
+
+    Attributes:
+        phases (list[PhaseStats]): The recorded phases.
+        stats (pstats.Stats | None): Function-level profile of all phases, None unless cProfile
+            was enabled.
+    """
+    phases: list[PhaseStats]
+    stats: pstats.Stats | None = None
+
+    def stage_seconds(self) -> dict[str, float]:
+        seconds: dict[str, float] = {}
+        for phase in self.phases:
+            seconds[phase.stage] = seconds.get(phase.stage, 0.0) + phase.seconds
+        return seconds
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(phase.seconds for phase in self.phases)
+
+    def slowest(self, n: int = 5) -> list[PhaseStats]:
+        return sorted(self.phases, key=lambda phase: phase.seconds, reverse=True)[:n]
+
+    def top_functions(self, n: int = 20, sort: str = "cumulative") -> str:
+        err_message = lambda: "Function-level profile requires Profiler(cprofile=True)"
+        assert self.stats is not None, err_message()
+
+        out = io.StringIO()
+        self.stats.stream = out # type: ignore
+        self.stats.sort_stats(sort).print_stats(n)
+        return out.getvalue()
+
+    def __str__(self) -> str:
+        memory = lambda phase: "" if phase.peak_memory is None else f"{phase.peak_memory / 2**20:.1f}"
+        rows = [("stage", "phase", "seconds", "vars", "bools", "constraints", "literals", "peak MiB")]
+        rows += [
+            (
+                phase.stage, phase.name, f"{phase.seconds:.4f}", str(phase.variables),
+                str(phase.bool_variables), str(phase.constraints),
+                str(phase.enforcement_literals), memory(phase),
+            )
+            for phase in self.phases
+        ]
+        rows += [("total", stage, f"{seconds:.4f}", "", "", "", "", "") for stage, seconds in self.stage_seconds().items()]
+
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        return '\n'.join(
+            "  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+            for row in rows
+        )
+
+
+class Profiler:
+    """
+    Records the phases of loading, building and solving an instance. Pass the same profiler to
+    `load_instance`, `Model` and the model is solved by `Solver.solve`, which attaches the report
+    as `SolvedSolver.profile`.
+
+    With `track_memory`, the peak memory of every phase is captured by `tracemalloc`, with
+    `cprofile` a function-level profile of all phases by `cProfile`. Both slow the phases down,
+    so their timings are only comparable with each other.
+    """
+
+    def __init__(self, *, track_memory: bool = False, cprofile: bool = False):
+        self.track_memory = track_memory
+        self.phases: list[PhaseStats] = []
+        self.__profile = cProfile.Profile() if cprofile else None
+
+    @contextmanager
+    def phase(self, stage: Stage, name: str, cp_model: "CpModel | None" = None):
+        """Measures the enclosed code, counting what it adds to `cp_model`."""
+        proto = cp_model.proto if cp_model is not None else None
+        variables_before = len(proto.variables) if proto is not None else 0
+        constraints_before = len(proto.constraints) if proto is not None else 0
+
+        started_tracing = self.track_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if self.track_memory:
+            tracemalloc.reset_peak()
+        if self.__profile is not None:
+            self.__profile.enable()
+
+        timer = Timer()
+        try:
+            yield
+        finally:
+            seconds = timer.elapsed_time()
+
+            if self.__profile is not None:
+                self.__profile.disable()
+            peak_memory = tracemalloc.get_traced_memory()[1] if self.track_memory else None
+            if started_tracing:
+                tracemalloc.stop()
+
+            variables = proto.variables[variables_before:] if proto is not None else []
+            constraints = proto.constraints[constraints_before:] if proto is not None else []
+            self.phases.append(PhaseStats(
+                stage=stage,
+                name=name,
+                seconds=seconds,
+                variables=len(variables),
+                bool_variables=sum(1 for v in variables if list(v.domain) == [0, 1]),
+                constraints=len(constraints),
+                enforcement_literals=sum(len(c.enforcement_literal) for c in constraints),
+                peak_memory=peak_memory,
+            ))
+
+    def report(self) -> ProfileReport:
+        stats = pstats.Stats(self.__profile) if self.__profile is not None and self.phases else None
+        return ProfileReport(list(self.phases), stats)
+
+
+def maybe_phase(profiler: Profiler | None, stage: Stage, name: str, cp_model: "CpModel | None" = None):
+    """`Profiler.phase` if a profiler is given, otherwise does nothing."""
+    return profiler.phase(stage, name, cp_model) if profiler is not None else nullcontext()
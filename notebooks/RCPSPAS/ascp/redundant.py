@@ -0,0 +1,87 @@
+from dataclasses import dataclass
+
+from . import instance
+from .presolve import Implications
+
+
+@dataclass(frozen=True)
+class TransitivePrecedence:
+    """`after` starts at least `lag` after `before` ends whenever both are scheduled."""
+    before: int
+    after: int
+    lag: int
+
+
+def incompatible_cliques(ins: instance.Instance) -> list[list[int]]:
+    """
+    Finds cliques of activities which can never run in parallel, because the demands of every
+    pair exceed the capacity of some resource. For every resource, the activities demanding more
+    than half of its capacity form a clique, which is extended by each smaller activity that is
+    incompatible with a prefix of the largest ones. Cliques contained in another one are dropped.
+    """
+    cliques: set[frozenset[int]] = set()
+    for r, capacity in enumerate(ins.resources):
+        users = sorted(
+            (a for a in ins.activities if a.duration > 0 and a.requirements[r] > 0),
+            key=lambda a: (-a.requirements[r], a.id),
+        )
+        big = [a for a in users if 2 * a.requirements[r] > capacity]
+        if big:
+            cliques.add(frozenset(a.id for a in big))
+
+        for small in users[len(big):]:
+            demand = small.requirements[r]
+            clique = [a.id for a in big if a.requirements[r] + demand > capacity]
+            if clique:
+                cliques.add(frozenset([*clique, small.id]))
+
+    maximal = [c for c in cliques if len(c) > 1 and not any(c < other for other in cliques)]
+    return sorted(sorted(c) for c in maximal)
+
+
+def topological_order(ins: instance.Instance) -> list[int]:
+    in_degree = [0] * len(ins.activities)
+    for a in ins.activities:
+        for s in a.successors:
+            in_degree[s] += 1
+
+    order = []
+    ready = [a.id for a in ins.activities if in_degree[a.id] == 0]
+    while ready:
+        a = ready.pop()
+        order.append(a)
+        for s in ins.activities[a].successors:
+            in_degree[s] -= 1
+            if in_degree[s] == 0:
+                ready.append(s)
+    return order
+
+
+def transitive_precedences(ins: instance.Instance) -> list[TransitivePrecedence]:
+    """
+    Derives precedences between activities connected by a path of at least two arcs whose
+    intermediate activities are all implied by the first one, so the path is enforced whenever the
+    endpoints are scheduled. The lag is the longest sum of intermediate durations over such paths.
+    Paths between two always scheduled activities are left out, since CP-SAT already propagates
+    chains of unconditional precedences exactly.
+    """
+    implies = Implications(ins).implies
+    order = topological_order(ins)
+    position = {a: i for i, a in enumerate(order)}
+
+    precedences = []
+    for u in ins.activities:
+        # longest sum of intermediate durations of a path enforced by u to every reachable activity
+        lags = {s: 0 for s in u.successors}
+        for w in order[position[u.id] + 1:]:
+            if w not in lags: continue
+
+            if lags[w] > 0 and not (0 in u.branches and 0 in ins.activities[w].branches):
+                precedences.append(TransitivePrecedence(u.id, w, lags[w]))
+
+            if implies(u.id, w):
+                lag = lags[w] + ins.activities[w].duration
+                for s in ins.activities[w].successors:
+                    lags[s] = max(lags.get(s, 0), lag)
+
+    return precedences
@@ -0,0 +1,212 @@
+import dataclasses
+import math
+from dataclasses import dataclass, field
+
+from . import instance
+from .bounds import lower_bounds
+from .compact_instance import CompactActivities
+from .model import Model, ModelConfig, Reservation
+from .solver import Solution, SolvedSolver, Solver
+
+
+@dataclass(frozen=True)
+class Disruption:
+    """
+    Change of an instance during the execution of its schedule.
+
+    Attributes:
+        durations (dict[int, int]): New durations of activities by activity id.
+        capacities (dict[int, int]): New capacities of resources by resource index, from `now` on.
+        forbidden_branches (frozenset[int]): Branches which can no longer be selected.
+        now (int | None): Current time. Activities of the old schedule which started before `now`
+            keep their start and stay scheduled, all other activities start at `now` or later.
+            None keeps the whole schedule open.
+    """
+    durations: dict[int, int] = field(default_factory=dict)
+    capacities: dict[int, int] = field(default_factory=dict)
+    forbidden_branches: frozenset[int] = frozenset()
+    now: int | None = None
+
+    def apply[I: instance.Instance](self, ins: I) -> I:
+        """
+        Returns a copy of the instance with the new durations and capacities. Since capacities only
+        change at `now`, the copy has the larger of the old and new capacity when `now` is set, and
+        `repair_model` lowers it before and after `now`.
+        """
+        if isinstance(ins.activities, CompactActivities):
+            activities = ins.activities.with_durations(self.durations)
+        else:
+            activities = [
+                dataclasses.replace(a, duration=self.durations[a.id]) if a.id in self.durations else a
+                for a in ins.activities
+            ]
+        resources = [
+            self.capacities.get(r, old) if self.now is None else max(old, self.capacities.get(r, old))
+            for r, old in enumerate(ins.resources)
+        ]
+        return dataclasses.replace(ins, activities=activities, resources=resources)
+
+    def frozen(self, solution: Solution) -> list[int]:
+        """Activities of `solution` which already started at `now`."""
+        if self.now is None:
+            return []
+        return [
+            a.id for a in solution.activities
+            if a.is_scheduled and a.start_time is not None and a.start_time < self.now
+        ]
+
+
+@dataclass
+class RepairConfig:
+    """
+    Configuration of `repair`.
+
+    Attributes:
+        minimize_deviation (bool): Minimize the objective plus the total shift of activity starts
+            against the old schedule, instead of the objective alone.
+        objective_weight (int | None): Weight of the objective against the deviation. Leaving None
+            weights one unit of the objective like shifting every activity by one.
+        model_config (ModelConfig): Configuration of the repaired model.
+    """
+    minimize_deviation: bool = False
+    objective_weight: int | None = None
+    model_config: ModelConfig = field(default_factory=ModelConfig)
+
+
+def __check_disruption(ins: instance.Instance, disruption: Disruption, frozen: list[int]):
+    branch_count = sum(len(sg.branches) for sg in ins.subgraphs)
+    err_message = lambda b: f"Branch {b} does not exist, branches are 1..{branch_count}"
+    for b in disruption.forbidden_branches:
+        assert 1 <= b <= branch_count, err_message(b)
+
+    for a in frozen:
+        if ins.activities[a].branches <= disruption.forbidden_branches:
+            raise ValueError(f"Activity {a} already started, its branches can not be forbidden")
+
+
+def __capacity_reservations(ins: instance.Instance, disruption: Disruption, tmin: int, tmax: int) -> list[Reservation]:
+    """
+    Resources of the disrupted model have the larger of their old and new capacity, the excess is
+    taken by a reservation before `now` (capacity raised) or after it (capacity lowered).
+    """
+    reservations = []
+    now = disruption.now
+    for r, capacity in disruption.capacities.items():
+        old = ins.resources[r]
+        if capacity == old: continue
+
+        start, end = (tmin, now) if capacity > old else (now, tmax)
+        if end > start:
+            reservations.append(Reservation(r, start, end, abs(capacity - old)))
+    return reservations
+
+
+def repair_model(
+    ins: instance.Instance,
+    solution: Solution,
+    disruption: Disruption,
+    config: RepairConfig = RepairConfig(),
+) -> Model:
+    """
+    Builds the model of the disrupted instance, hinted with the old schedule. Activities which
+    already started are fixed to their old start, forbidden branches are fixed to unselected and
+    everything else is shifted to start no earlier than `now`.
+    """
+    frozen = disruption.frozen(solution)
+    __check_disruption(ins, disruption, frozen)
+
+    disrupted = disruption.apply(ins)
+    # every schedule which runs the rest serially after `now` must fit the horizon
+    tmax = config.model_config.tmax or (disruption.now or 0) + sum(a.duration for a in disrupted.activities)
+    reservations = [] if disruption.now is None else __capacity_reservations(ins, disruption, config.model_config.tmin, tmax)
+    model = Model(disrupted, config=dataclasses.replace(config.model_config, tmax=tmax), reservations=reservations)
+    cp_model = model.cp_model
+
+    for b in sorted(disruption.forbidden_branches):
+        cp_model.add(model.branches[b] == 0)
+
+    frozen_set = set(frozen)
+    for activity, solved in zip(model.activities, solution.activities):
+        if activity.activity.id in frozen_set:
+            cp_model.add(activity.is_scheduled == 1)
+            cp_model.add(activity.start == solved.start_time)
+        elif disruption.now is not None:
+            cp_model.add(activity.start >= disruption.now)
+
+    model.add_hint(solution)
+
+    if config.minimize_deviation:
+        deviations = []
+        for activity, solved in zip(model.activities, solution.activities):
+            if activity.activity.id in frozen_set or not solved.is_scheduled: continue
+            deviation = cp_model.new_int_var(0, tmax, f"activity_{activity.activity.id}_deviation")
+            cp_model.add_abs_equality(deviation, activity.start - solved.start_time)
+            deviations.append(deviation)
+
+        weight = config.objective_weight or len(ins.activities)
+        cp_model.minimize(weight * model.objective + sum(deviations))
+
+    return model
+
+
+class RepairedSolver(SolvedSolver):
+    """
+    Result of `repair` with `minimize_deviation`. CP-SAT minimizes the weighted objective plus the
+    deviation, so its bound is not a bound of the objective: `best_bound` and `gap` only use the
+    lower bound of the disrupted instance, and the bound of the weighted objective is reported by
+    `weighted_bound` and `weighted_gap`.
+    """
+
+    @property
+    def best_bound(self) -> int:
+        return self.lower_bound
+
+    @property
+    def is_optimal(self) -> bool:
+        return bool(self.solution_times) and self.cp_solver.status_name() == "OPTIMAL"
+
+    @property
+    def weighted_objective(self) -> int:
+        return round(self.cp_solver.objective_value)
+
+    @property
+    def weighted_bound(self) -> int:
+        return math.ceil(self.cp_solver.best_objective_bound)
+
+    @property
+    def weighted_gap(self) -> float:
+        if not self.solution_times: return math.inf
+        objective = self.weighted_objective
+        if objective <= self.weighted_bound: return 0.0
+        return (objective - self.weighted_bound) / max(1, abs(objective))
+
+
+def repair(
+    ins: instance.Instance,
+    solution: Solution,
+    disruption: Disruption,
+    config: RepairConfig = RepairConfig(),
+    *,
+    solver: Solver | None = None,
+) -> SolvedSolver:
+    """
+    Re-solves a schedule after a disruption, warm-started from the old schedule by `repair_model`.
+    The solved model's instance is the disrupted one, see `Disruption.apply` for its capacities.
+    With `minimize_deviation`, the search does not stop at the lower bound of the objective, since
+    the deviation may still improve, and the result is a `RepairedSolver`.
+    """
+    model = repair_model(ins, solution, disruption, config)
+    solver = solver or Solver()
+    lower_bound = -1 if config.minimize_deviation else None
+    solved = solver.solve(model, lower_bound)
+
+    if not solved.solution_times:
+        status = solved.cp_solver.status_name()
+        if status == "INFEASIBLE":
+            raise ValueError("No repaired schedule exists, started activities may exceed the new capacities or their lengthened predecessors")
+        raise TimeoutError(f"No repaired schedule found within the time limit ({status})")
+
+    if config.minimize_deviation:
+        objective_bound = lower_bounds(model.instance).objective(model.objective_type)
+        return RepairedSolver(solved.cp_solver, solved.solution, model, solved.solution_times, objective_bound, solved.profile)
+    return solved
@@ -0,0 +1,247 @@
+import json
+import math
+import os
+import warnings
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+from ortools.sat.sat_parameters_pb2 import SatParameters
+
+from . import instance
+from .features import InstanceFeatures, extract_features
+from .solver import SolvedSolver
+
+
+@dataclass(frozen=True)
+class SolverConfig:
+    """
+    Named set of `SatParameters` overrides. Only the listed fields are set, the time limit is
+    chosen per instance by `ConfigSelector`.
+    """
+    name: str
+    params: dict[str, bool | int | float | str] = field(default_factory=dict)
+
+    def sat_parameters(self, time_limit: float | None = None) -> SatParameters:
+        params = SatParameters(**self.params)
+        if time_limit is not None:
+            params.max_time_in_seconds = time_limit
+        return params
+
+
+@dataclass(frozen=True)
+class BenchmarkRecord:
+    """
+    Outcome of solving one instance with one configuration.
+
+    Attributes:
+        instance (str): Instance name.
+        config (str): `SolverConfig.name`.
+        features (InstanceFeatures): Features of the instance.
+        status (str): Solver status name.
+        objective (int | None): Best objective found, None if no solution was found.
+        time_to_best (float | None): Wall time at which the best solution was found.
+        wall_time (float): Total wall time of the solve.
+        time_limit (float): Time limit of the solve.
+    """
+    instance: str
+    config: str
+    features: InstanceFeatures
+    status: str
+    objective: int | None
+    time_to_best: float | None
+    wall_time: float
+    time_limit: float
+
+    @property
+    def is_optimal(self) -> bool:
+        return self.status == "OPTIMAL"
+
+    def to_json(self) -> str:
+        d = asdict(self)
+        d["features"] = self.features.asdict()
+        return json.dumps(d)
+
+    @classmethod
+    def from_json(cls, line: str) -> "BenchmarkRecord":
+        d = json.loads(line)
+        d["features"] = InstanceFeatures.fromdict(d["features"])
+        return cls(**d)
+
+
+class BenchmarkRecorder:
+    """
+    Append-only JSON lines log of `BenchmarkRecord`s. Features are extracted once per instance
+    object, so recording several configurations of the same instance is cheap.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.__features: dict[int, tuple[instance.Instance, InstanceFeatures]] = {}
+
+    def features(self, ins: instance.Instance) -> InstanceFeatures:
+        cached = self.__features.get(id(ins))
+        if cached is None or cached[0] is not ins:
+            cached = self.__features[id(ins)] = (ins, extract_features(ins))
+        return cached[1]
+
+    def record(self, ins: instance.Instance, config: SolverConfig | str, solved: SolvedSolver) -> BenchmarkRecord:
+        found = bool(solved.solution_times)
+        record = BenchmarkRecord(
+            instance=ins.name,
+            config=config.name if isinstance(config, SolverConfig) else config,
+            features=self.features(ins),
+            status="OPTIMAL" if solved.is_optimal else solved.cp_solver.status_name(),
+            objective=solved.solution.objective if found else None,
+            time_to_best=solved.solution_times[-1].wall_time if found else None,
+            wall_time=solved.cp_solver.wall_time,
+            time_limit=solved.params.max_time_in_seconds,
+        )
+
+        os.makedirs(self.path.parent, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(record.to_json() + "\n")
+        return record
+
+    def records(self) -> list[BenchmarkRecord]:
+        if not self.path.exists():
+            return []
+        with open(self.path) as f:
+            return [BenchmarkRecord.from_json(line) for line in f if line.strip()]
+
+
+@dataclass(frozen=True)
+class Selection:
+    config: str
+    time_limit: float
+
+
+def best_records(records: Iterable[BenchmarkRecord]) -> dict[str, BenchmarkRecord]:
+    """
+    Picks the winning record of every instance: the best objective, then proven optimality, then
+    the shortest time to the best solution.
+    """
+    best: dict[str, BenchmarkRecord] = {}
+    key = lambda r: (
+        r.objective is None,
+        r.objective if r.objective is not None else 0,
+        not r.is_optimal,
+        r.time_to_best if r.time_to_best is not None else math.inf,
+    )
+
+    for r in records:
+        if r.instance not in best or key(r) < key(best[r.instance]):
+            best[r.instance] = r
+    return best
+
+
+class ConfigSelector:
+    """
+    k-nearest-neighbours selector of a solver configuration and time budget. It is trained offline
+    from `BenchmarkRecord`s: every instance is labelled with the configuration of its winning
+    record, and a new instance gets the majority configuration of its `k` nearest instances in the
+    standardized feature space (weighted by inverse distance). The time budget is `margin` times
+    the largest time to best of that configuration among the neighbours, clipped to
+    `[min_time_limit, max_time_limit]`.
+    """
+
+    def __init__(self,
+        k: int = 5,
+        margin: float = 1.5,
+        min_time_limit: float = 1,
+        max_time_limit: float = 60,
+    ):
+        self.k = k
+        self.margin = margin
+        self.min_time_limit = min_time_limit
+        self.max_time_limit = max_time_limit
+
+        self.__mean = np.zeros(0)
+        self.__scale = np.zeros(0)
+        self.__points = np.zeros((0, 0))
+        self.__labels: list[str] = []
+        self.__times: dict[tuple[str, int], float] = {}
+
+    @property
+    def configs(self) -> list[str]:
+        return sorted(set(self.__labels))
+
+    def fit(self, records: Iterable[BenchmarkRecord]) -> "ConfigSelector":
+        records = list(records)
+        best = best_records(records)
+        assert best, "Cannot fit a selector without any records"
+
+        names = sorted(best)
+        points = np.array([best[n].features.values() for n in names])
+        with warnings.catch_warnings():
+            # features missing in every instance, e.g. WtParams of an ASLIB-only corpus
+            warnings.simplefilter("ignore", RuntimeWarning)
+            self.__mean = np.nanmean(points, axis=0)
+            self.__scale = np.nanstd(points, axis=0)
+        self.__mean[np.isnan(self.__mean)] = 0
+        self.__scale[~(self.__scale > 0)] = 1
+
+        self.__points = self.__standardize(points)
+        self.__labels = [best[n].config for n in names]
+
+        # time to best of every configuration on every training instance, for the time budget
+        index = {n: i for i, n in enumerate(names)}
+        self.__times = {}
+        for r in records:
+            if r.time_to_best is None or r.objective != best[r.instance].objective: continue
+            key = (r.config, index[r.instance])
+            self.__times[key] = min(self.__times.get(key, math.inf), r.time_to_best)
+
+        return self
+
+    def __standardize(self, points: np.ndarray) -> np.ndarray:
+        # missing features (e.g. WtParams of ASLIB instances) sit at the mean
+        standardized = (points - self.__mean) / self.__scale
+        return np.nan_to_num(standardized, nan=0.0)
+
+    def predict_features(self, features: InstanceFeatures) -> Selection:
+        assert self.__labels, "The selector has not been fitted"
+
+        point = self.__standardize(features.values()[None, :])[0]
+        distances = np.linalg.norm(self.__points - point, axis=1)
+        neighbours = np.argsort(distances, kind="stable")[:self.k]
+
+        votes: dict[str, float] = {}
+        for i in neighbours.tolist():
+            votes[self.__labels[i]] = votes.get(self.__labels[i], 0) + 1 / (distances[i] + 1e-9)
+        config = max(sorted(votes), key=votes.__getitem__)
+
+        times = [self.__times[(config, i)] for i in neighbours.tolist() if (config, i) in self.__times]
+        time_limit = self.margin * max(times) if times else self.max_time_limit
+        return Selection(config, float(np.clip(time_limit, self.min_time_limit, self.max_time_limit)))
+
+    def predict(self, ins: instance.Instance) -> Selection:
+        return self.predict_features(extract_features(ins))
+
+    def save(self, path: str | Path):
+        with open(path, "w") as f:
+            json.dump({
+                "k": self.k,
+                "margin": self.margin,
+                "min_time_limit": self.min_time_limit,
+                "max_time_limit": self.max_time_limit,
+                "mean": self.__mean.tolist(),
+                "scale": self.__scale.tolist(),
+                "points": self.__points.tolist(),
+                "labels": self.__labels,
+                "times": [[c, i, t] for (c, i), t in self.__times.items()],
+            }, f)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ConfigSelector":
+        with open(path) as f:
+            d = json.load(f)
+
+        selector = cls(d["k"], d["margin"], d["min_time_limit"], d["max_time_limit"])
+        selector.__mean = np.array(d["mean"])
+        selector.__scale = np.array(d["scale"])
+        selector.__points = np.array(d["points"]).reshape(-1, len(InstanceFeatures.labels()))
+        selector.__labels = d["labels"]
+        selector.__times = {(c, i): t for c, i, t in d["times"]}
+        return selector
@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Self
+
+from . import instance
+
+if TYPE_CHECKING:
+    from ortools.sat.python.cp_model import LinearExprT
+
+    from . import model
+    from .solver import Solver
+
+
+@dataclass(frozen=True)
+class SolvedActivity:
+    id: int
+    is_scheduled: bool
+    resource_requirements: list[int]
+    start_time: int | None = None
+    end_time: int | None = None
+
+    @property
+    def original_id(self) -> str:
+        return str(self.id + 1)
+
+    @classmethod
+    def from_activity(cls, activity: "model.Activity", solver: "Solver"):
+        return cls.from_values(activity, solver.cp_solver.value)
+
+    @classmethod
+    def from_values(cls, activity: "model.Activity", value: Callable[["LinearExprT"], int]):
+        """Reads the activity from `value`, e.g. `CpSolver.value` or a solution callback's `value`."""
+        start_time = value(activity.start)
+        end_time = start_time + activity.activity.duration
+
+        return cls(
+            id=activity.activity.id,
+            is_scheduled=value(activity.is_scheduled) != 0,
+            start_time=start_time,
+            end_time=end_time,
+            resource_requirements=activity.activity.requirements,
+        )
+
+    def dump(self) -> str:
+        match self.is_scheduled:
+            case False: return "0"
+            case True: return f"1 {self.start_time} {self.end_time}"
+
+    @classmethod
+    def from_dump(cls, id: int, activity: instance.Activity, line: str):
+        make = lambda scheduled, start = None, end = None: cls(
+            id=id,
+            is_scheduled=scheduled,
+            start_time=start,
+            end_time=end,
+            resource_requirements=activity.requirements,
+        )
+
+        nums = list(map(int, line.split()))
+        match nums:
+            case [0]: return make(False)
+            case [1, start_time, end_time]: return make(True, start_time, end_time)
+            case _: raise ValueError(f"Invalid SolvedActivity dump line: {line}")
+
+
+@dataclass(frozen=True)
+class Solution:
+    objective: int
+    activities: list[SolvedActivity]
+
+    def __getitem__(self, activity: "instance.Activity | model.Activity"):
+        # a `model.Activity` wraps the activity of the instance
+        activity = getattr(activity, "activity", activity)
+
+        return self.activities[activity.id]
+
+    def dump(self) -> str:
+        return '\n'.join([str(self.objective)] + [a.dump() for a in self.activities])
+
+    @classmethod
+    def from_solver(cls, solver: "Solver", model: "model.Model") -> Self:
+        return cls.from_values(model, solver.cp_solver.value)
+
+    @classmethod
+    def from_values(cls, model: "model.Model", value: Callable[["LinearExprT"], int]) -> Self:
+        return cls(
+            objective=int(value(model.objective)),
+            activities=[
+                SolvedActivity.from_values(activity, value)
+                for activity in model.activities
+            ],
+        )
+
+    @classmethod
+    def from_dump(cls, dump: str, ins: instance.Instance) -> Self:
+        def parse_activities(objective: str, activity_lines: list[str]):
+            err_message = lambda: f"expected {len(ins.activities)} lines, got {len(activity_lines)}"
+            assert len(activity_lines) == len(ins.activities), err_message()
+
+            return cls(
+                objective=int(objective),
+                activities=[
+                    SolvedActivity.from_dump(id, activity, line)
+                    for id, (activity, line) in enumerate(zip(ins.activities, activity_lines))
+                ],
+            )
+
+        match dump.splitlines():
+            case [objective, *activity_lines]: return parse_activities(objective, activity_lines)
+            case _: raise ValueError("Invalid dump format")
@@ -0,0 +1,259 @@
+import json
+import os
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, overload
+
+import numpy as np
+
+from . import instance
+from .solution import Solution, SolvedActivity
+
+
+@dataclass(frozen=True)
+class StoredRun:
+    """
+    Metadata of a single solution stored in a `SolutionStore`.
+
+    Attributes:
+        index (int): Position of the run in the store.
+        name (str): Name of the solved instance.
+        objective (int): Objective value of the stored solution.
+        offset (int): Offset of the first activity of the run in the column files.
+        length (int): Number of activities of the run.
+        metadata (dict[str, Any]): Arbitrary JSON-serializable run metadata.
+    """
+    index: int
+    name: str
+    objective: int
+    offset: int
+    length: int
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class RunArrays:
+    is_scheduled: np.ndarray
+    start_time: np.ndarray
+    end_time: np.ndarray
+
+
+class LazyActivities(Sequence[SolvedActivity]):
+    """
+    Read-only sequence of `SolvedActivity` backed by the columns of a stored run. Activities are
+    materialized only when accessed.
+    """
+
+    def __init__(self, arrays: RunArrays, ins: instance.Instance):
+        err_message = lambda: f"expected {len(ins.activities)} activities, got {len(arrays.is_scheduled)}"
+        assert len(arrays.is_scheduled) == len(ins.activities), err_message()
+
+        self.arrays = arrays
+        self.__instance = ins
+        self.__cache: dict[int, SolvedActivity] = {}
+
+    def __len__(self) -> int:
+        return len(self.arrays.is_scheduled)
+
+    @overload
+    def __getitem__(self, idx: int) -> SolvedActivity: ...
+    @overload
+    def __getitem__(self, idx: slice) -> list[SolvedActivity]: ...
+    def __getitem__(self, idx: int | slice):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(f"Activity index {idx} out of range")
+
+        if idx not in self.__cache:
+            self.__cache[idx] = self.__materialize(idx)
+        return self.__cache[idx]
+
+    def __materialize(self, idx: int) -> SolvedActivity:
+        requirements = self.__instance.activities[idx].requirements
+        if not self.arrays.is_scheduled[idx]:
+            return SolvedActivity(id=idx, is_scheduled=False, resource_requirements=requirements)
+
+        return SolvedActivity(
+            id=idx,
+            is_scheduled=True,
+            start_time=int(self.arrays.start_time[idx]),
+            end_time=int(self.arrays.end_time[idx]),
+            resource_requirements=requirements,
+        )
+
+
+class SolutionStore:
+    """
+    Append-only columnar store for many solutions. Every run is stored as a slice of three column
+    files (`is_scheduled`, `start_time` and `end_time`) and a JSON line with its metadata. Columns
+    are read through memory maps, so opening a store with thousands of runs is cheap.
+
+    The store supports a single writer. A run becomes visible only after its metadata line is
+    written, so an interrupted append leaves the store consistent.
+    """
+
+    __RUNS_FILE = "runs.jsonl"
+    __COLUMNS = {
+        "is_scheduled": np.dtype(np.uint8),
+        "start_time": np.dtype(np.int64),
+        "end_time": np.dtype(np.int64),
+    }
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        os.makedirs(self.path, exist_ok=True)
+
+        self.__runs: list[StoredRun] = []
+        self.__by_name: dict[str, list[int]] = {}
+        self.__maps: dict[str, np.ndarray] | None = None
+
+        runs_file = self.path / SolutionStore.__RUNS_FILE
+        if runs_file.exists():
+            with open(runs_file, "r") as f:
+                for line in filter(None, map(str.strip, f)):
+                    self.__add_run(StoredRun(index=len(self.__runs), **json.loads(line)))
+
+    def __add_run(self, run: StoredRun):
+        self.__runs.append(run)
+        self.__by_name.setdefault(run.name, []).append(run.index)
+
+    def __len__(self) -> int:
+        return len(self.__runs)
+
+    def __iter__(self) -> Iterator[StoredRun]:
+        return iter(self.__runs)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.__by_name
+
+    def __getitem__(self, key: int | str) -> StoredRun:
+        """Returns the run at the given index, or the latest run of the given instance name."""
+        if isinstance(key, str):
+            if key not in self.__by_name:
+                raise KeyError(f"No stored run for instance {key}")
+            return self.__runs[self.__by_name[key][-1]]
+
+        return self.__runs[key]
+
+    @property
+    def names(self) -> list[str]:
+        return list(self.__by_name)
+
+    def runs(self, name: str) -> list[StoredRun]:
+        return [self.__runs[i] for i in self.__by_name.get(name, [])]
+
+    @property
+    def __activity_count(self) -> int:
+        if not self.__runs: return 0
+        return self.__runs[-1].offset + self.__runs[-1].length
+
+    def __column_path(self, column: str) -> Path:
+        return self.path / f"{column}.bin"
+
+    def __append_columns(self, columns: dict[str, np.ndarray], metadata: dict[str, Any], name: str, objective: int):
+        offset = self.__activity_count
+        length = len(columns["is_scheduled"])
+
+        for column, dtype in SolutionStore.__COLUMNS.items():
+            with open(self.__column_path(column), "ab") as f:
+                # drop leftovers of an interrupted append before writing the new run
+                f.truncate(offset * dtype.itemsize)
+                f.write(np.ascontiguousarray(columns[column], dtype=dtype).tobytes())
+
+        run = StoredRun(
+            index=len(self.__runs),
+            name=name,
+            objective=int(objective),
+            offset=offset,
+            length=length,
+            metadata=metadata,
+        )
+
+        with open(self.path / SolutionStore.__RUNS_FILE, "a") as f:
+            record = {
+                "name": run.name,
+                "objective": run.objective,
+                "offset": run.offset,
+                "length": run.length,
+                "metadata": run.metadata,
+            }
+            f.write(json.dumps(record) + "\n")
+
+        self.__add_run(run)
+        self.__maps = None
+        return run
+
+    def append(self, name: str, solution: Solution, **metadata: Any) -> StoredRun:
+        activities = solution.activities
+        if isinstance(activities, LazyActivities):
+            columns = {
+                "is_scheduled": activities.arrays.is_scheduled,
+                "start_time": activities.arrays.start_time,
+                "end_time": activities.arrays.end_time,
+            }
+        else:
+            columns = {
+                "is_scheduled": np.fromiter((a.is_scheduled for a in activities), np.uint8, len(activities)),
+                "start_time": np.fromiter((a.start_time or 0 for a in activities), np.int64, len(activities)),
+                "end_time": np.fromiter((a.end_time or 0 for a in activities), np.int64, len(activities)),
+            }
+
+        return self.__append_columns(columns, metadata, name, solution.objective)
+
+    def append_dump(self, name: str, dump: str, **metadata: Any) -> StoredRun:
+        """Appends a solution in the `Solution.dump` text format without materializing it."""
+        match dump.splitlines():
+            case [objective, *activity_lines]: pass
+            case _: raise ValueError("Invalid dump format")
+
+        columns = {column: np.zeros(len(activity_lines), dtype) for column, dtype in SolutionStore.__COLUMNS.items()}
+        for i, line in enumerate(activity_lines):
+            match line.split():
+                case ["0"]: pass
+                case ["1", start_time, end_time]:
+                    columns["is_scheduled"][i] = 1
+                    columns["start_time"][i] = int(start_time)
+                    columns["end_time"][i] = int(end_time)
+                case _: raise ValueError(f"Invalid SolvedActivity dump line: {line}")
+
+        return self.__append_columns(columns, metadata, name, int(objective))
+
+    def __columns(self) -> dict[str, np.ndarray]:
+        if self.__maps is None:
+            count = self.__activity_count
+            self.__maps = {
+                column: (
+                    np.memmap(self.__column_path(column), dtype=dtype, mode="r", shape=(count,))
+                    if count else np.zeros(0, dtype)
+                )
+                for column, dtype in SolutionStore.__COLUMNS.items()
+            }
+
+        return self.__maps
+
+    def arrays(self, key: int | str | StoredRun) -> RunArrays:
+        run = key if isinstance(key, StoredRun) else self[key]
+        columns = self.__columns()
+        window = slice(run.offset, run.offset + run.length)
+
+        return RunArrays(
+            is_scheduled=columns["is_scheduled"][window],
+            start_time=columns["start_time"][window],
+            end_time=columns["end_time"][window],
+        )
+
+    def solution(self, key: int | str | StoredRun, ins: instance.Instance) -> Solution:
+        """Returns a `Solution` view of a stored run, materializing activities only on access."""
+        run = key if isinstance(key, StoredRun) else self[key]
+        return Solution(
+            objective=run.objective,
+            activities=LazyActivities(self.arrays(run), ins),  # type: ignore[arg-type]
+        )
+
+    def objectives(self) -> np.ndarray:
+        return np.fromiter((run.objective for run in self.__runs), np.int64, len(self.__runs))
@@ -1,100 +1,17 @@
 from dataclasses import dataclass
+import math
 import sys
-from typing import Callable, Self
+from typing import TYPE_CHECKING, Callable
 from ortools.sat.python.cp_model import CpSolver, CpSolverSolutionCallback
 from ortools.sat.sat_parameters_pb2 import SatParameters
 
-from . import instance, model
+from . import model
+from .bounds import lower_bounds
+from .profiling import ProfileReport, maybe_phase
+from .solution import Solution, SolvedActivity
 
-
-@dataclass(frozen=True)
-class SolvedActivity:
-    id: int
-    is_scheduled: bool
-    resource_requirements: list[int]
-    start_time: int | None = None
-    end_time: int | None = None
-
-    @property
-    def original_id(self) -> str:
-        return str(self.id + 1)
-
-    @classmethod
-    def from_activity(cls, activity: model.Activity, solver: "Solver"):
-        start_time = solver.cp_solver.value(activity.start)
-        end_time = start_time + activity.activity.duration
-
-        return cls(
-            id=activity.activity.id,
-            is_scheduled=solver.cp_solver.value(activity.is_scheduled) != 0,
-            start_time=start_time,
-            end_time=end_time,
-            resource_requirements=activity.activity.requirements,
-        )
-
-    def dump(self) -> str:
-        match self.is_scheduled:
-            case False: return "0"
-            case True: return f"1 {self.start_time} {self.end_time}"
-
-    @classmethod
-    def from_dump(cls, id: int, activity: instance.Activity, line: str):
-        make = lambda scheduled, start = None, end = None: cls(
-            id=id,
-            is_scheduled=scheduled,
-            start_time=start,
-            end_time=end,
-            resource_requirements=activity.requirements,
-        )
-
-        nums = list(map(int, line.split()))
-        match nums:
-            case [0]: return make(False)
-            case [1, start_time, end_time]: return make(True, start_time, end_time)
-            case _: raise ValueError(f"Invalid SolvedActivity dump line: {line}")
-
-
-@dataclass(frozen=True)
-class Solution:
-    objective: int
-    activities: list[SolvedActivity]
-
-    def __getitem__(self, activity: instance.Activity | model.Activity):
-        if isinstance(activity, model.Activity):
-            activity = activity.activity
-
-        return self.activities[activity.id]
-
-    def dump(self) -> str:
-        return '\n'.join([str(self.objective)] + [a.dump() for a in self.activities])
-
-    @classmethod
-    def from_solver(cls, solver: "Solver", model: model.Model) -> Self:
-        return cls(
-            objective=int(solver.cp_solver.objective_value),
-            activities=[
-                SolvedActivity.from_activity(activity, solver)
-                for activity in model.activities
-            ],
-        )
-
-    @classmethod
-    def from_dump(cls, dump: str, ins: instance.Instance) -> Self:
-        def parse_activities(objective: str, activity_lines: list[str]):
-            err_message = lambda: f"expected {len(ins.activities)} lines, got {len(activity_lines)}"
-            assert len(activity_lines) == len(ins.activities), err_message()
-
-            return cls(
-                objective=int(objective),
-                activities=[
-                    SolvedActivity.from_dump(id, activity, line)
-                    for id, (activity, line) in enumerate(zip(ins.activities, activity_lines))
-                ],
-            )
-
-        match dump.splitlines():
-            case [objective, *activity_lines]: return parse_activities(objective, activity_lines)
-            case _: raise ValueError("Invalid dump format")
+if TYPE_CHECKING:
+    from .checkpoint import Checkpointer
 
 
 class Solver:
@@ -126,7 +43,22 @@ class Solver:
     def params(self) -> SatParameters:
         return self.cp_solver.parameters
 
-    def solve(self, model: model.Model) -> "SolvedSolver":
+    def solve(self,
+        model: model.Model,
+        lower_bound: int | None = None,
+        checkpoint: "Checkpointer | None" = None,
+    ) -> "SolvedSolver":
+        """
+        Solves the model. The search stops as soon as a solution matches `lower_bound`, which
+        defaults to the bound computed by `ascp.bounds.lower_bounds` from the model's instance.
+        With a `checkpoint`, the incumbent is periodically persisted so the solve can be resumed
+        by `ascp.checkpoint.resume`. If the model was built with a profiler, the solve is recorded
+        to it and its report is attached as `SolvedSolver.profile`.
+        """
+        if lower_bound is None:
+            with maybe_phase(model.profiler, "solve", "lower_bounds"):
+                lower_bound = lower_bounds(model.instance).objective(model.objective_type)
+
         solution_times: list[Solver.SolutionSnapshot] = []
         def on_solution(cb: CpSolverSolutionCallback):
             objective = cb.value(model.objective)
@@ -137,12 +69,26 @@ class Solver:
                     user_time=cb.user_time,
                     wall_time=cb.wall_time,
                 ))
+            if checkpoint is not None:
+                checkpoint.on_solution(cb, model, solution_times)
+            if objective <= lower_bound:
+                cb.stop_search()
+
+        if checkpoint is not None:
+            checkpoint.start(model, self.params, lower_bound)
 
         sys.stdout.flush()
-        self.cp_solver.solve(model.cp_model, Solver.__SolutionCallback(on_solution))
+        with maybe_phase(model.profiler, "solve", "cp_sat"):
+            self.cp_solver.solve(model.cp_model, Solver.__SolutionCallback(on_solution))
         sys.stdout.flush()
-        solution = Solution.from_solver(self, model)
-        return SolvedSolver(self.cp_solver, solution, model, solution_times)
+        with maybe_phase(model.profiler, "solve", "solution"):
+            solution = Solution.from_solver(self, model)
+        profile = model.profiler.report() if model.profiler is not None else None
+        solved = SolvedSolver(self.cp_solver, solution, model, solution_times, lower_bound, profile)
+
+        if checkpoint is not None:
+            checkpoint.finish(solved)
+        return solved
 
 
 class SolvedSolver(Solver):
@@ -151,21 +97,57 @@ class SolvedSolver(Solver):
         solution: Solution,
         model: model.Model,
         solution_times: list[Solver.SolutionSnapshot],
+        lower_bound: int = 0,
+        profile: ProfileReport | None = None,
     ):
         super().__init__(solver)
         self.solution = solution
         self.model = model
         self.solution_times = solution_times
+        self.lower_bound = lower_bound
+        self.profile = profile
 
+    @property
+    def best_bound(self) -> int:
+        """The better of the precomputed lower bound and the bound proven by CP-SAT."""
+        return max(self.lower_bound, math.ceil(self.cp_solver.best_objective_bound))
+
+    @property
+    def gap(self) -> float:
+        """
+        Relative gap between the incumbent and `best_bound`, 0 if the incumbent is optimal and inf
+        without an incumbent, whose objective is meaningless.
+        """
+        if not self.solution_times: return math.inf
+        objective = self.solution.objective
+        if objective <= self.best_bound: return 0.0
+        return (objective - self.best_bound) / max(1, abs(objective))
+
+    @property
+    def is_optimal(self) -> bool:
+        if not self.solution_times: return False
+        return self.cp_solver.status_name() == "OPTIMAL" or self.solution.objective <= self.lower_bound
 
     @property
     def status_str(self):
+        def status():
+            status = self.cp_solver.status_name()
+            if status != "OPTIMAL" and self.is_optimal:
+                return f"{status} (optimal, matches the lower bound)"
+            return status
+
         def solution_time():
             if not self.solution_times: return None
             return f"solution time: {self.solution_times[-1].wall_time:.2f} seconds"
 
         return '\n'.join(x for x in [
-            f"solver status: {self.cp_solver.status_name()}",
-            f"objective value: {self.cp_solver.objective_value}",
+            f"solver status: {status()}",
+            f"objective value: {self.solution.objective if self.solution_times else 'no solution'}",
+            f"lower bound: {self.best_bound}, gap: {100 * self.gap:.2f}%",
             solution_time(),
         ] if x)
+
+
+# re-exported, `Solution` and `SolvedActivity` used to live here
+Solution = Solution
+SolvedActivity = SolvedActivity
@@ -2,7 +2,6 @@ import os
 import re
 import time
 
-from alive_progress import alive_it
 from typing import Callable, Iterable
 
 from ascp.instance import AslibInstance, Instance, WtInstance
@@ -60,7 +59,12 @@ def __iterate_instances[I: Instance](
         if instance_files:
             print(f"Iterating {root}")
 
-            progress = alive_it if show_progress else lambda x: x
+            if show_progress:
+                # alive_progress is slow to import, so only pay for it when a progress bar is shown
+                from alive_progress import alive_it
+                progress = alive_it
+            else:
+                progress = lambda x: x
             for file in progress(instance_files):
                 try:
                     instance = load_instance(os.path.join(root, file))
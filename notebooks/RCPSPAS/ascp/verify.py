@@ -0,0 +1,224 @@
+import typing as tp
+from dataclasses import dataclass
+
+import numpy as np
+
+from . import instance
+from .compact_instance import CompactActivities
+from .solution_store import LazyActivities
+from .solution import Solution
+
+
+ViolationKind = tp.Literal[
+    "duration",
+    "precedence",
+    "subgraph",
+    "scheduled",
+    "capacity",
+    "objective",
+]
+
+
+@dataclass(frozen=True)
+class Violation:
+    """
+    A single violated constraint found by `verify_solution`.
+
+    Attributes:
+        kind (ViolationKind): Which family of constraints is violated.
+        message (str): Human readable description, activity IDs are 1-based as in the instance files.
+        activities (tuple[int, ...]): 0-based IDs of the activities involved.
+    """
+    kind: ViolationKind
+    message: str
+    activities: tuple[int, ...] = ()
+
+    def __str__(self) -> str:
+        return f"[{self.kind}] {self.message}"
+
+
+@dataclass(frozen=True)
+class __SolutionArrays:
+    is_scheduled: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+
+
+def __solution_arrays(solution: Solution) -> __SolutionArrays:
+    activities = solution.activities
+    if isinstance(activities, LazyActivities):
+        return __SolutionArrays(
+            is_scheduled=np.asarray(activities.arrays.is_scheduled, bool),
+            start=np.asarray(activities.arrays.start_time, np.int64),
+            end=np.asarray(activities.arrays.end_time, np.int64),
+        )
+
+    count = len(activities)
+    return __SolutionArrays(
+        is_scheduled=np.fromiter((a.is_scheduled for a in activities), bool, count),
+        start=np.fromiter((a.start_time or 0 for a in activities), np.int64, count),
+        end=np.fromiter((a.end_time or 0 for a in activities), np.int64, count),
+    )
+
+
+def __ids(mask: np.ndarray) -> list[int]:
+    return np.flatnonzero(mask).tolist()
+
+
+def __check_durations(acts: CompactActivities, sol: __SolutionArrays, tmin: int) -> list[Violation]:
+    wrong_duration = sol.is_scheduled & (sol.end - sol.start != acts.durations)
+    before_tmin = sol.is_scheduled & (sol.start < tmin)
+
+    return [
+        Violation("duration", f"Activity {a + 1} lasts {sol.end[a] - sol.start[a]}, expected {acts.durations[a]}", (a,))
+        for a in __ids(wrong_duration)
+    ] + [
+        Violation("duration", f"Activity {a + 1} starts at {sol.start[a]}, before {tmin}", (a,))
+        for a in __ids(before_tmin)
+    ]
+
+
+def __check_precedences(acts: CompactActivities, sol: __SolutionArrays) -> list[Violation]:
+    sources, targets = acts.edges()
+    violated = (
+        sol.is_scheduled[sources]
+        & sol.is_scheduled[targets]
+        & (sol.end[sources] > sol.start[targets])
+    )
+
+    return [
+        Violation("precedence", f"Activity {s + 1} ends at {sol.end[s]} after its successor {t + 1} starts at {sol.start[t]}", (s, t))
+        for s, t in zip(sources[violated].tolist(), targets[violated].tolist())
+    ]
+
+
+def __selected_branches(ins: instance.Instance, acts: CompactActivities, sol: __SolutionArrays) -> tuple[np.ndarray, list[Violation]]:
+    """
+    Infers the selected branches from the scheduled first activities of each branch, and checks
+    that exactly one branch is selected for every scheduled branching activity.
+    """
+    branch_count = 1 + sum(len(sg.branches) for sg in ins.subgraphs)
+    selected = np.zeros(branch_count, bool)
+    selected[0] = True
+
+    single_branch = np.diff(acts.branch_indptr) == 1
+    branch_of = np.full(len(acts), -1, np.int64)
+    branch_of[single_branch] = acts.branch_indices[acts.branch_indptr[:-1][single_branch]]
+
+    violations = []
+    for sg in ins.subgraphs:
+        heads = [s for s in acts.successor_ids(sg.principal_activity).tolist() if branch_of[s] in sg.branches]
+        for head in heads:
+            selected[branch_of[head]] |= sol.is_scheduled[head]
+
+        chosen = sorted(b for b in sg.branches if selected[b])
+        expected = int(sol.is_scheduled[sg.principal_activity])
+        if len(chosen) != expected:
+            message = (
+                f"Subgraph {sg.id} has {len(chosen)} selected branches {[b + 1 for b in chosen]}, "
+                f"expected {expected} (branching activity {sg.principal_activity + 1} "
+                f"is {'' if expected else 'not '}scheduled)"
+            )
+            violations.append(Violation("subgraph", message, (sg.principal_activity, *heads)))
+
+    return selected, violations
+
+
+def __check_scheduled(acts: CompactActivities, sol: __SolutionArrays, selected: np.ndarray) -> list[Violation]:
+    owners = np.repeat(np.arange(len(acts)), np.diff(acts.branch_indptr))
+    selected_count = np.zeros(len(acts), np.int64)
+    np.add.at(selected_count, owners, selected[acts.branch_indices])
+    expected = selected_count > 0
+
+    return [
+        Violation(
+            "scheduled",
+            f"Activity {a + 1} is {'' if sol.is_scheduled[a] else 'not '}scheduled, "
+            f"but {'none' if sol.is_scheduled[a] else 'some'} of its branches "
+            f"{[b + 1 for b in acts.branch_ids(a).tolist()]} are selected",
+            (a,),
+        )
+        for a in __ids(expected != sol.is_scheduled)
+    ]
+
+
+def __check_capacities(ins: instance.Instance, acts: CompactActivities, sol: __SolutionArrays) -> list[Violation]:
+    violations = []
+    for r, capacity in enumerate(ins.resources):
+        demands = acts.requirements[:, r]
+        active = sol.is_scheduled & (demands > 0) & (sol.end > sol.start)
+        if not active.any(): continue
+
+        times = np.concatenate([sol.start[active], sol.end[active]])
+        deltas = np.concatenate([demands[active], -demands[active]])
+        # at equal times, releases go first, so that touching intervals do not overlap
+        order = np.lexsort((deltas, times))
+        times, load = times[order], np.cumsum(deltas[order])
+
+        overloaded = load > capacity
+        # report every maximal overloaded time window once
+        window_starts = np.flatnonzero(overloaded & ~np.concatenate([[False], overloaded[:-1]]))
+        for i in window_starts.tolist():
+            t = times[i]
+            involved = __ids(active & (sol.start <= t) & (sol.end > t))
+            message = (
+                f"Resource {r + 1} is loaded {load[i]} > {capacity} at time {t} "
+                f"by activities {[a + 1 for a in involved]}"
+            )
+            violations.append(Violation("capacity", message, tuple(involved)))
+
+    return violations
+
+
+def __check_objective(ins: instance.Instance, sol: __SolutionArrays, objective: int, objective_type: str) -> list[Violation]:
+    match objective_type:
+        case "cmax":
+            actual = int(sol.end[sol.is_scheduled].max(initial=0))
+        case "wt":
+            assert isinstance(ins, instance.WtInstance), "wt objective can only be used with WtInstance instances"
+            actual = sum(
+                dd.weight * max(0, int(sol.end[a]) - dd.due_date)
+                for a, dd in ins.due_dates.items()
+            )
+        case _:
+            raise ValueError(f"Invalid objective: {objective_type}")
+
+    if actual == objective:
+        return []
+    return [Violation("objective", f"Objective is {objective}, but the schedule has {objective_type} {actual}")]
+
+
+def verify_solution(
+    ins: instance.Instance,
+    solution: Solution,
+    objective: tp.Literal["cmax", "wt"] | None = None,
+    *,
+    tmin: int = 0,
+) -> list[Violation]:
+    """
+    Independently checks a solution of an ASCP instance and returns all violations found. Checks
+    durations, precedences among scheduled activities, branch selection of every subgraph, that
+    exactly the activities of selected branches are scheduled, renewable resource capacities
+    (with an event sweep per resource) and the objective value.
+
+    Runs in O((A + E) log A) for A activities and E precedences, so it is cheap enough to audit
+    every solution of a batch run, regardless of the solver which produced it.
+    """
+    if objective is None:
+        objective = "wt" if isinstance(ins, instance.WtInstance) else "cmax"
+
+    err_message = lambda: f"Expected {len(ins.activities)} activities, got {len(solution.activities)}"
+    assert len(solution.activities) == len(ins.activities), err_message()
+
+    acts = CompactActivities.from_activities(ins.activities)
+    sol = __solution_arrays(solution)
+    selected, subgraph_violations = __selected_branches(ins, acts, sol)
+
+    return [
+        *__check_durations(acts, sol, tmin),
+        *__check_precedences(acts, sol),
+        *subgraph_violations,
+        *__check_scheduled(acts, sol, selected),
+        *__check_capacities(ins, acts, sol),
+        *__check_objective(ins, sol, solution.objective, objective),
+    ]
@@ -1,6 +1,5 @@
 import os
 from pathlib import Path
-from typing import TextIO
 from ascp.__shared import other_instance_file_path
 from ascp.instance import AslibInstance, Instance, WtInstance
 
@@ -37,30 +36,41 @@ def __write_wt_instance(instance: WtInstance, pa, pb, pwt):
         pwt(a + 1, dd.weight, dd.due_date)
 
 
-def write_instance(instance: Instance, file_a: str | Path):
+def write_instance(instance: Instance, file_a: str | Path, *, overwrite: bool = False):
     file_b = other_instance_file_path(file_a, "b")
 
-    if os.path.exists(file_a) or os.path.exists(file_b):
+    if not overwrite and (os.path.exists(file_a) or os.path.exists(file_b)):
         raise FileExistsError(f"File {file_a} or {file_b} already exists")
 
     os.makedirs(os.path.dirname(file_a), exist_ok=True)
-    with open(file_a, "w") as fa, open(file_b, "w") as fb:
-        def makeprint(f: TextIO):
-            def p(*args, **kwargs):
-                print(*args, **kwargs, file=f)
-            return p
-
-        pa = makeprint(fa)
-        pb = makeprint(fb)
-
-        if isinstance(instance, AslibInstance):
-            __write_aslib_instance(instance, pa, pb)
-        elif isinstance(instance, WtInstance):
-            file_wt = other_instance_file_path(file_a, "wt")
-            if os.path.exists(file_wt):
-                raise FileExistsError(f"File {file_wt} already exists")
-            with open(file_wt, "w") as fwt:
-                pwt = makeprint(fwt)
-                __write_wt_instance(instance, pa, pb, pwt)
-        else:
-            raise ValueError("Can only write WtInstance or AslibInstance")
+
+    # lines are collected in memory and written in one batch per file
+    def makeprint(lines: list[str]):
+        def p(*args):
+            lines.append(" ".join(map(str, args)))
+        return p
+
+    def flush(file: str | Path, lines: list[str]):
+        with open(file, "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+    lines_a: list[str] = []
+    lines_b: list[str] = []
+    pa = makeprint(lines_a)
+    pb = makeprint(lines_b)
+
+    if isinstance(instance, AslibInstance):
+        __write_aslib_instance(instance, pa, pb)
+    elif isinstance(instance, WtInstance):
+        file_wt = other_instance_file_path(file_a, "wt")
+        if not overwrite and os.path.exists(file_wt):
+            raise FileExistsError(f"File {file_wt} already exists")
+
+        lines_wt: list[str] = []
+        __write_wt_instance(instance, pa, pb, makeprint(lines_wt))
+        flush(file_wt, lines_wt)
+    else:
+        raise ValueError("Can only write WtInstance or AslibInstance")
+
+    flush(file_a, lines_a)
+    flush(file_b, lines_b)
@@ -0,0 +1,6 @@
+"""
+JSP - Job-Shop Scheduling heuristics
+Fast NumPy upper bounds and starting points for the CP models of the job shop notebook, working
+on the `MC`/`PT` matrices returned by its `load_instance`, and a time-window decomposition with
+CP-SAT for the large instances.
+"""
@@ -0,0 +1,281 @@
+import random
+import time
+import typing as tp
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+from ortools.sat.python.cp_model import CpModel, CpSolver, FEASIBLE, OPTIMAL
+from ortools.sat.sat_parameters_pb2 import SatParameters
+
+from .heuristics import JobShop, longest_paths, makespan, tabu_search
+
+Strategy = tp.Literal["time", "bottleneck", "mixed"]
+
+
+@dataclass
+class DecompositionConfig:
+    """
+    Configuration of `decompose`.
+
+    Attributes:
+        window_ops (int): Number of operations freed by a time window.
+        strategy (Strategy): "time" re-optimizes all windows of a tiling of the schedule, shifted
+            randomly every round, "bottleneck" only the windows containing critical operations,
+            with twice as many operations, and "mixed" alternates the two.
+        time_limit (float): Wall-clock limit of the whole decomposition in seconds.
+        window_time_limit (float): Time limit of a single window.
+        window_workers (int): CP-SAT workers of a single window.
+        parallel (int): Windows solved at once, they are disjoint so their results merge.
+        initial_time_limit (float): Time of the tabu search giving the initial schedule, when none
+            is given.
+        tabu_time (float): Time of the tabu search from the merged schedule after every round,
+            which moves the windows out of the local optimum of the previous round. 0 disables it.
+        seed (int): Seed of the window offsets and of the tabu searches.
+    """
+    window_ops: int = 60
+    strategy: Strategy = "mixed"
+    time_limit: float = 60
+    window_time_limit: float = 2
+    window_workers: int = 2
+    parallel: int = 4
+    initial_time_limit: float = 2
+    tabu_time: float = 3
+    seed: int = 0
+
+
+@dataclass(frozen=True)
+class DecompositionResult:
+    """
+    Outcome of `decompose`.
+
+    Attributes:
+        sequence (np.ndarray): Machine sequences of the best schedule, see `jsp.heuristics.makespan`.
+        makespan (int): Makespan of `sequence`.
+        rounds (int): Number of rounds of windows.
+        windows (int): Number of windows solved.
+        seconds (float): Wall time, including the initial tabu search.
+        reference (int | None): Optimum or best known makespan the progress is tracked against.
+        history (list[tuple[float, int]]): (seconds, makespan) of every improvement, starting
+            with the initial schedule.
+    """
+    sequence: np.ndarray
+    makespan: int
+    rounds: int
+    windows: int
+    seconds: float
+    reference: int | None = None
+    history: list[tuple[float, int]] = field(default_factory=list)
+
+    @property
+    def gap(self) -> float | None:
+        """Relative gap to `reference`, None without one."""
+        if self.reference is None: return None
+        return (self.makespan - self.reference) / self.reference
+
+
+@dataclass(frozen=True)
+class __Window:
+    """
+    Operations starting in [start, end) of the current schedule. Operations starting earlier keep
+    their times, operations starting later keep their machine order and their tails.
+    """
+    start: int
+    end: int
+    ops: np.ndarray
+
+
+def __heads_tails(js: JobShop, sequence: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    times = js.times.ravel()
+    job_ops = np.arange(times.size).reshape(js.n_jobs, js.n_machines)
+    heads = longest_paths(times, job_ops, sequence)
+    tails = longest_paths(times, job_ops[:, ::-1], sequence[:, ::-1])
+    err_message = lambda: "The machine sequences contain a cycle"
+    assert heads is not None and tails is not None, err_message()
+    return heads, tails
+
+
+def __tile(heads: np.ndarray, window_ops: int, offset: int) -> list[__Window]:
+    """Consecutive windows of about `window_ops` operations by start time, the first one shorter."""
+    order = np.argsort(heads, kind="stable")
+    bounds = sorted({int(heads[order[k]]) for k in range(offset % window_ops, len(order), window_ops)} | {0})
+    bounds.append(int(heads.max()) + 1)
+    windows = []
+    for start, end in zip(bounds, bounds[1:]):
+        ops = np.flatnonzero((heads >= start) & (heads < end))
+        if len(ops) > 1:
+            windows.append(__Window(start, end, ops))
+    return windows
+
+
+def __solve_window(
+    js: JobShop,
+    sequence: np.ndarray,
+    heads: np.ndarray,
+    tails: np.ndarray,
+    window: __Window,
+    config: DecompositionConfig,
+) -> tuple[int, dict[int, list[int]]] | None:
+    """
+    Re-sequences the operations of the window with CP-SAT. The objective is the makespan of the
+    whole merged schedule: the longest path through a freed operation is its end plus the tail of
+    its job successor or of the first later operation on its machine, and paths around the window
+    are a constant. Returns the makespan and the new order of the freed operations on every machine,
+    or None if the order did not change.
+    """
+    times = js.times.ravel()
+    M = js.n_machines
+    machines = js.machines.ravel()
+    ends = heads + times
+    current = int(ends.max())
+    free = set(window.ops.tolist())
+    is_past = lambda op: heads[op] < window.start
+    is_future = lambda op: heads[op] >= window.end
+
+    # per machine: release by the earlier operations, freed operations, first later operation
+    release, rows, first_future = {}, {}, {}
+    for m, row in enumerate(sequence.tolist()):
+        if not (freed := [op for op in row if op in free]): continue
+        rows[m] = freed
+        release[m] = max((int(ends[op]) for op in row if is_past(op)), default=0)
+        first_future[m] = next((op for op in row if is_future(op)), None)
+
+    # paths which do not pass through the window, from an earlier to a later operation
+    constant = max((int(ends[op]) for op in range(times.size) if is_past(op)), default=0)
+    for row in sequence.tolist():
+        for previous, op in zip([None] + row, row):
+            if is_future(op):
+                preds = [p for p in (op - 1 if op % M else None, previous) if p is not None and is_past(p)]
+                head = max((int(ends[p]) for p in preds), default=0)
+                constant = max(constant, head + int(times[op] + tails[op]))
+
+    model = CpModel()
+    objective = model.new_int_var(constant, current, "makespan")
+    starts, intervals = {}, {}
+    for op in window.ops.tolist():
+        m = int(machines[op])
+        job_pred, job_succ = (op - 1 if op % M else None), (op + 1 if op % M < M - 1 else None)
+        lb = max(release[m], int(ends[job_pred]) if job_pred is not None and job_pred not in free else 0)
+        tail = max(
+            int(times[job_succ] + tails[job_succ]) if job_succ is not None and job_succ not in free else 0,
+            int(times[f] + tails[f]) if (f := first_future[m]) is not None else 0,
+        )
+        ub = current - int(times[op]) - tail
+        if ub < lb:
+            return None
+        starts[op] = model.new_int_var(lb, ub, f"s_{op}")
+        intervals[op] = model.new_fixed_size_interval_var(starts[op], int(times[op]), f"x_{op}")
+        model.add(objective >= starts[op] + int(times[op]) + tail)
+        model.add_hint(starts[op], int(heads[op]))
+
+    for op in starts:
+        if (job_pred := op - 1 if op % M else None) is not None and job_pred in free:
+            model.add(starts[op] >= starts[job_pred] + int(times[job_pred]))
+    for row in rows.values():
+        if len(row) > 1:
+            model.add_no_overlap([intervals[op] for op in row])
+
+    model.minimize(objective)
+
+    solver = CpSolver()
+    solver.parameters = SatParameters(max_time_in_seconds=config.window_time_limit, num_workers=config.window_workers)
+    if solver.solve(model) not in (OPTIMAL, FEASIBLE):
+        return None
+
+    orders = {
+        m: sorted(row, key=lambda op: (solver.value(starts[op]), heads[op]))
+        for m, row in rows.items()
+    }
+    if all(orders[m] == rows[m] for m in rows):
+        return None
+    return int(solver.value(objective)), orders
+
+
+def __merge(sequence: np.ndarray, orders: dict[int, list[int]]) -> np.ndarray:
+    """Replaces the freed operations, which are consecutive on every machine, by their new order."""
+    merged = sequence.copy()
+    for m, order in orders.items():
+        row = merged[m].tolist()
+        positions = sorted(row.index(op) for op in order)
+        err_message = lambda: f"Freed operations of machine {m} are not consecutive"
+        assert positions == list(range(positions[0], positions[0] + len(order))), err_message()
+        merged[m, positions[0]:positions[0] + len(order)] = order
+    return merged
+
+
+def decompose(
+    js: JobShop,
+    sequence: np.ndarray | None = None,
+    config: DecompositionConfig = DecompositionConfig(),
+    *,
+    reference: int | None = None,
+    lower_bound: int | None = None,
+    log: bool = False,
+) -> DecompositionResult:
+    """
+    Improves a job shop schedule by re-optimizing small time windows with the rest of the schedule
+    fixed, see `__solve_window`. Every round takes windows of the current schedule by
+    `config.strategy` and solves them in parallel. Windows are disjoint in time, so operations only
+    pass from earlier windows to later ones and all results merge into an acyclic schedule; if the
+    merged makespan is worse than the best single window, only that window is kept. The round ends
+    with a short tabu search from the merged schedule.
+
+    Starts from `sequence` or a short tabu search. Stops at `config.time_limit`, or when
+    `reference` (the optimum or best known makespan) or `lower_bound` is reached. With `log`,
+    every improvement is printed with its gap to `reference`.
+    """
+    started = time.perf_counter()
+    elapsed = lambda: time.perf_counter() - started
+    rng = random.Random(config.seed)
+    if sequence is None:
+        sequence = tabu_search(js, time_limit=config.initial_time_limit, target=reference, seed=config.seed).sequence
+    target = max(reference or 0, lower_bound or 0, js.lower_bound)
+
+    history: list[tuple[float, int]] = []
+    def report(value: int):
+        history.append((elapsed(), value))
+        if log:
+            gap = f", gap {100 * (value - reference) / reference:.2f}%" if reference else ""
+            print(f"{elapsed():7.2f}s  makespan {value}{gap}", flush=True)
+
+    best = makespan(js, sequence)
+    report(best)
+
+    rounds = windows_solved = 0
+    with ThreadPoolExecutor(config.parallel) as pool:
+        while best > target and elapsed() < config.time_limit:
+            rounds += 1
+            heads, tails = __heads_tails(js, sequence)
+            bottleneck = config.strategy == "bottleneck" or (config.strategy == "mixed" and rounds % 2 == 0)
+            window_ops = 2 * config.window_ops if bottleneck else config.window_ops
+            windows = __tile(heads, window_ops, rng.randrange(window_ops))
+            if bottleneck:
+                critical = heads + js.times.ravel() + tails == best
+                windows = [w for w in windows if critical[w.ops].any()]
+
+            solve = lambda w: __solve_window(js, sequence, heads, tails, w, config)
+            results = [r for r in pool.map(solve, windows) if r is not None]
+            windows_solved += len(windows)
+            if results:
+                merged = sequence
+                for _, orders in results:
+                    merged = __merge(merged, orders)
+                value = makespan(js, merged)
+                single_value, single_orders = min(results, key=lambda r: r[0])
+                if single_value < value:
+                    merged, value = __merge(sequence, single_orders), single_value
+                if value <= best:
+                    sequence = merged
+                    if value < best:
+                        best = value
+                        report(best)
+
+            if config.tabu_time and best > target and elapsed() < config.time_limit:
+                tabu = tabu_search(js, sequence, time_limit=min(config.tabu_time, config.time_limit - elapsed()), target=target, seed=rng.randrange(1 << 30))
+                if tabu.makespan <= best:
+                    sequence = tabu.sequence
+                    if tabu.makespan < best:
+                        best = tabu.makespan
+                        report(best)
+
+    return DecompositionResult(sequence, best, rounds, windows_solved, elapsed(), reference, history)
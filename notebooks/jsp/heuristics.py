@@ -0,0 +1,383 @@
+import operator
+import random
+import time
+import typing as tp
+from dataclasses import dataclass, field
+
+import numpy as np
+
+Rule = tp.Literal["SPT", "LPT", "MWKR", "LWKR", "MOPNR", "FCFS"]
+Neighborhood = tp.Literal["N5", "N7"]
+
+DISPATCHING_RULES: tuple[Rule, ...] = tp.get_args(Rule)
+
+
+@dataclass(frozen=True)
+class JobShop:
+    """
+    Job shop instance as arrays. Operation `j` of job `i` has the flat index `i * M + j`.
+
+    Attributes:
+        machines (np.ndarray): `MC`, machine of every operation, shape (N, M).
+        times (np.ndarray): `PT`, processing time of every operation, shape (N, M).
+    """
+    machines: np.ndarray
+    times: np.ndarray
+
+    @staticmethod
+    def from_matrices(MC: tp.Sequence[tp.Sequence[int]], PT: tp.Sequence[tp.Sequence[int]]) -> "JobShop":
+        machines, times = np.asarray(MC, dtype=np.int64), np.asarray(PT, dtype=np.int64)
+        err_message = lambda: "Every job must visit every machine exactly once"
+        assert (np.sort(machines, axis=1) == np.arange(machines.shape[1])).all(), err_message()
+        return JobShop(machines, times)
+
+    @property
+    def n_jobs(self) -> int:
+        return self.machines.shape[0]
+
+    @property
+    def n_machines(self) -> int:
+        return self.machines.shape[1]
+
+    @property
+    def lower_bound(self) -> int:
+        """The larger of the longest job and the largest machine load."""
+        loads = np.bincount(self.machines.ravel(), self.times.ravel(), minlength=self.n_machines)
+        return int(max(self.times.sum(axis=1).max(), loads.max()))
+
+
+@dataclass(frozen=True)
+class TabuResult:
+    """
+    Outcome of `tabu_search`.
+
+    Attributes:
+        sequence (np.ndarray): Best machine sequences found, see `makespan`.
+        makespan (int): Makespan of `sequence`.
+        iterations (int): Number of moves made.
+        seconds (float): Wall time of the search.
+        history (list[tuple[float, int]]): (seconds, makespan) of every improvement, starting
+            with the initial sequence.
+    """
+    sequence: np.ndarray
+    makespan: int
+    iterations: int
+    seconds: float
+    history: list[tuple[float, int]] = field(default_factory=list)
+
+
+def longest_paths(times: np.ndarray, job_ops: np.ndarray, machine_ops: np.ndarray) -> np.ndarray | None:
+    """
+    Longest path to the start of every operation in the disjunctive graph of job chains
+    `job_ops` (N, M) and machine chains `machine_ops` (M, N) of flat operation indices.
+
+    Along a chain with exclusive prefix sums `c` of processing times, the starts satisfy
+    `s[k] = max(s[k], s[k-1] + p[k-1])`, so `s - c` is a running maximum. Passes over all jobs and
+    then all machines at once are repeated until nothing changes. Returns None if the graph has a
+    cycle, detected by a start beyond the sum of all processing times.
+    """
+    starts = np.zeros(times.size, dtype=np.int64)
+    job_offsets = np.cumsum(times[job_ops], axis=1) - times[job_ops]
+    machine_offsets = np.cumsum(times[machine_ops], axis=1) - times[machine_ops]
+    total = int(times.sum())
+
+    for _ in range(times.size + 1):
+        job_starts = np.maximum.accumulate(starts[job_ops] - job_offsets, axis=1) + job_offsets
+        starts[job_ops] = job_starts
+        machine_starts = np.maximum.accumulate(starts[machine_ops] - machine_offsets, axis=1) + machine_offsets
+        if (machine_starts == starts[machine_ops]).all():
+            return starts
+        starts[machine_ops] = machine_starts
+        if starts.max() > total:
+            return None
+    return None
+
+
+class __Graph:
+    """Heads, tails and critical path of the machine sequences of a job shop."""
+
+    def __init__(self, js: JobShop):
+        N, M = js.n_jobs, js.n_machines
+        ops = np.arange(N * M)
+        self.times = js.times.ravel()
+        self.job_ops = ops.reshape(N, M)
+        self.op_times: list[int] = self.times.tolist()
+        self.job_pred: list[int] = np.where(ops % M > 0, ops - 1, -1).tolist()
+        self.job_succ: list[int] = np.where(ops % M < M - 1, ops + 1, -1).tolist()
+
+    def evaluate(self, sequence: np.ndarray) -> tuple[list[int], list[int]] | None:
+        """Heads and tails (longest path after the end) of all operations, None if cyclic."""
+        heads = longest_paths(self.times, self.job_ops, sequence)
+        if heads is None:
+            return None
+        tails = longest_paths(self.times, self.job_ops[:, ::-1], sequence[:, ::-1])
+        return heads.tolist(), tails.tolist()
+
+    def critical_blocks(self, rows: list[list[int]], heads: list[int], rng: random.Random) -> list[tuple[int, int, int]]:
+        """
+        Blocks (machine, first position, last position) of a critical path, traced back from a
+        last operation and taking a random critical predecessor on ties.
+        """
+        times = self.op_times
+        position, machine = [0] * len(times), [0] * len(times)
+        for m, row in enumerate(rows):
+            for k, op in enumerate(row):
+                position[op], machine[op] = k, m
+
+        ends = [h + p for h, p in zip(heads, times)]
+        makespan = max(ends)
+        op = rng.choice([op for op, end in enumerate(ends) if end == makespan])
+        path = [op]
+        while heads[op] > 0:
+            candidates = []
+            if (jp := self.job_pred[op]) >= 0 and ends[jp] == heads[op]:
+                candidates.append(jp)
+            if position[op] > 0 and ends[mp := rows[machine[op]][position[op] - 1]] == heads[op]:
+                candidates.append(mp)
+            op = rng.choice(candidates)
+            path.append(op)
+        path.reverse()
+
+        blocks = []
+        for op in path:
+            m, k = machine[op], position[op]
+            if blocks and blocks[-1][0] == m and blocks[-1][2] == k - 1:
+                blocks[-1] = (m, blocks[-1][1], k)
+            else:
+                blocks.append((m, k, k))
+        return blocks
+
+
+def __moves(blocks: list[tuple[int, int, int]], neighborhood: Neighborhood) -> list[tuple[int, int, int]]:
+    """
+    Moves (machine, from position, to position) of the critical blocks. N5 swaps the first and the
+    last two operations of every block, except the first pair of the first block and the last pair
+    of the last block. N7 swaps both pairs of every block and moves every inner operation to the
+    front and the back of its block and the first and the last operation to every inner position.
+    """
+    moves = set()
+    for b, (m, first, last) in enumerate(blocks):
+        if last == first: continue
+        if neighborhood == "N5":
+            if b > 0: moves.add((m, first, first + 1))
+            if b < len(blocks) - 1: moves.add((m, last, last - 1))
+            continue
+
+        moves |= {(m, first, first + 1), (m, last, last - 1)}
+        for k in range(first + 1, last):
+            moves |= {(m, k, first), (m, k, last), (m, first, k), (m, last, k)}
+    return sorted(moves)
+
+
+def __apply(sequence: np.ndarray, move: tuple[int, int, int]) -> np.ndarray:
+    m, a, b = move
+    row = sequence[m].tolist()
+    row.insert(b, row.pop(a))
+    moved = sequence.copy()
+    moved[m] = row
+    return moved
+
+
+def __estimate(graph: __Graph, rows: list[list[int]], heads: list[int], tails: list[int], move: tuple[int, int, int]) -> int:
+    """
+    Makespan estimate of a move from the heads and tails before it: the reordered segment of the
+    machine is re-timed between its unchanged neighbours and job predecessors and successors.
+    """
+    m, a, b = move
+    lo, hi = min(a, b), max(a, b)
+    row = rows[m]
+    segment = row[lo:hi + 1]
+    segment.insert(b - lo, segment.pop(a - lo))
+    times, job_pred, job_succ = graph.op_times, graph.job_pred, graph.job_succ
+
+    new_heads = []
+    head = heads[row[lo - 1]] + times[row[lo - 1]] if lo > 0 else 0
+    for op in segment:
+        if (jp := job_pred[op]) >= 0 and heads[jp] + times[jp] > head:
+            head = heads[jp] + times[jp]
+        new_heads.append(head)
+        head += times[op]
+
+    estimate = 0
+    tail = tails[row[hi + 1]] + times[row[hi + 1]] if hi + 1 < len(row) else 0
+    for op, head in zip(reversed(segment), reversed(new_heads)):
+        if (js := job_succ[op]) >= 0 and tails[js] + times[js] > tail:
+            tail = tails[js] + times[js]
+        if head + times[op] + tail > estimate:
+            estimate = head + times[op] + tail
+        tail += times[op]
+    return estimate
+
+
+def __is_acyclic(graph: __Graph, rows: list[list[int]], heads: list[int], tails: list[int], move: tuple[int, int, int]) -> bool:
+    """
+    Sufficient conditions of Balas and Vazacopoulos: moving `u` right after `v` keeps the graph
+    acyclic if the tail of `v` is at least the tail of the job successor of `u`, and moving it
+    right before `v` if the head of `u` is at least the head of the job predecessor of `v`.
+    """
+    m, a, b = move
+    if abs(a - b) == 1: return True
+    u, v = rows[m][a], rows[m][b]
+    times = graph.op_times
+    if b > a:
+        js = graph.job_succ[u]
+        return js < 0 or tails[v] + times[v] >= tails[js] + times[js]
+    jp = graph.job_pred[v]
+    return jp < 0 or heads[u] + times[u] >= heads[jp] + times[jp]
+
+
+def __reordered_pairs(rows: list[list[int]], move: tuple[int, int, int]) -> list[tuple[int, int]]:
+    """Pairs (x, y) of operations in which `x` is before `y` after the move, but not before it."""
+    m, a, b = move
+    u = rows[m][a]
+    if b > a:
+        return [(w, u) for w in rows[m][a + 1:b + 1]]
+    return [(u, w) for w in rows[m][b:a]]
+
+
+def start_times(js: JobShop, sequence: np.ndarray) -> np.ndarray:
+    """
+    Earliest start times, shape (N, M), of the semi-active schedule with the given machine
+    sequences. `sequence` has shape (M, N), row `k` lists the flat indices of the operations on
+    machine `k` in processing order. Raises ValueError if the sequences contradict the jobs.
+    """
+    N, M = js.n_jobs, js.n_machines
+    heads = longest_paths(js.times.ravel(), np.arange(N * M).reshape(N, M), np.asarray(sequence))
+    if heads is None:
+        raise ValueError("The machine sequences contain a cycle")
+    return heads.reshape(N, M)
+
+
+def makespan(js: JobShop, sequence: np.ndarray) -> int:
+    """Makespan of the semi-active schedule of the machine sequences, see `start_times`."""
+    return int((start_times(js, sequence) + js.times).max())
+
+
+def sequence_from_starts(js: JobShop, starts: tp.Sequence[tp.Sequence[int]] | np.ndarray) -> np.ndarray:
+    """Machine sequences of a schedule given by its start times, e.g. a CP solution."""
+    starts = np.asarray(starts, dtype=np.int64).ravel()
+    ops = np.arange(starts.size)
+    machines = js.machines.ravel()
+    order = np.lexsort((ops, starts, machines))
+    return ops[order].reshape(js.n_machines, js.n_jobs)
+
+
+def dispatch(js: JobShop, rule: Rule = "MWKR") -> np.ndarray:
+    """
+    Active schedule by Giffler and Thompson: the machine of the operation which can complete first
+    takes, of its operations which can start before that, the one preferred by `rule`. Rules are
+    shortest or longest processing time (SPT, LPT), most or least work remaining in the job (MWKR,
+    LWKR), most operations remaining (MOPNR) and earliest ready job (FCFS), ties go to the lower job.
+    Returns the machine sequences, see `start_times`.
+    """
+    N, M = js.n_jobs, js.n_machines
+    times, machines = js.times, js.machines
+    remaining_work = np.cumsum(times[:, ::-1], axis=1)[:, ::-1]
+    jobs = np.arange(N)
+
+    next_op = np.zeros(N, dtype=np.int64)
+    job_ready = np.zeros(N, dtype=np.int64)
+    machine_ready = np.zeros(M, dtype=np.int64)
+    sequence = [[] for _ in range(M)]
+
+    for _ in range(N * M):
+        active = jobs[next_op < M]
+        pos = next_op[active]
+        op_machines, op_times = machines[active, pos], times[active, pos]
+        starts = np.maximum(job_ready[active], machine_ready[op_machines])
+        ends = starts + op_times
+
+        machine = op_machines[np.argmin(ends)]
+        conflict = (op_machines == machine) & (starts < ends.min())
+        match rule:
+            case "SPT": priority = op_times
+            case "LPT": priority = -op_times
+            case "MWKR": priority = -remaining_work[active, pos]
+            case "LWKR": priority = remaining_work[active, pos]
+            case "MOPNR": priority = pos
+            case "FCFS": priority = job_ready[active]
+            case _: raise ValueError(f"Invalid dispatching rule: {rule}")
+        k = np.flatnonzero(conflict)[np.argmin(priority[conflict])]
+
+        job = active[k]
+        sequence[machine].append(job * M + pos[k])
+        job_ready[job] = machine_ready[machine] = ends[k]
+        next_op[job] += 1
+
+    return np.array(sequence, dtype=np.int64)
+
+
+def tabu_search(
+    js: JobShop,
+    sequence: np.ndarray | None = None,
+    *,
+    neighborhood: Neighborhood = "N7",
+    time_limit: float = 10,
+    max_iterations: int | None = None,
+    target: int | None = None,
+    tenure: tuple[int, int] | None = None,
+    restart_after: int = 2000,
+    seed: int = 0,
+) -> TabuResult:
+    """
+    Tabu search over the critical blocks of the machine sequences, starting from `sequence` or the
+    best dispatching rule. Every iteration takes the move with the best `__estimate` which does not
+    restore the order of a pair of operations reordered within the tabu tenure, unless it is
+    estimated to beat the best makespan. The tenure of every pair is drawn from `tenure`, which
+    defaults to around 10 + N / M. After `restart_after` iterations without an improvement the
+    search returns to the best sequence. Stops at `time_limit` seconds, `max_iterations`, or when
+    `target` (e.g. the optimum) or the lower bound of the instance is reached.
+    """
+    started = time.perf_counter()
+    elapsed = lambda: time.perf_counter() - started
+    rng = random.Random(seed)
+    graph = __Graph(js)
+    if sequence is None:
+        sequence = min((dispatch(js, rule) for rule in DISPATCHING_RULES), key=lambda s: makespan(js, s))
+    if tenure is None:
+        base = 10 + js.n_jobs // js.n_machines
+        tenure = (base, base + max(2, base // 2))
+    target = max(target or 0, js.lower_bound)
+
+    evaluated = graph.evaluate(sequence)
+    err_message = lambda: "The initial machine sequences contain a cycle"
+    assert evaluated is not None, err_message()
+    heads, tails = evaluated
+    rows: list[list[int]] = sequence.tolist()
+    best, best_sequence = makespan(js, sequence), sequence
+    history = [(elapsed(), best)]
+
+    tabu: dict[tuple[int, int], int] = {}
+    iteration = since_improvement = 0
+    while best > target and elapsed() < time_limit and (max_iterations is None or iteration < max_iterations):
+        iteration += 1
+        since_improvement += 1
+        if since_improvement > restart_after:
+            sequence, rows, since_improvement = best_sequence, best_sequence.tolist(), 0
+            heads, tails = tp.cast(tuple[list[int], list[int]], graph.evaluate(sequence))
+            tabu.clear()
+
+        blocks = graph.critical_blocks(rows, heads, rng)
+        candidates = [
+            (__estimate(graph, rows, heads, tails, move), rng.random(), move)
+            for move in __moves(blocks, neighborhood)
+            if __is_acyclic(graph, rows, heads, tails, move)
+        ]
+        if not candidates:
+            break  # a single critical block, the makespan is a machine load
+
+        is_allowed = lambda c: c[0] < best or all(tabu.get(pair, 0) <= iteration for pair in __reordered_pairs(rows, c[2]))
+        _, _, move = next(filter(is_allowed, sorted(candidates)), None) or rng.choice(candidates)
+
+        moved = __apply(sequence, move)
+        if (evaluated := graph.evaluate(moved)) is None:
+            continue
+        for x, y in __reordered_pairs(rows, move):
+            tabu[(y, x)] = iteration + rng.randint(*tenure)
+        sequence, rows, (heads, tails) = moved, moved.tolist(), evaluated
+
+        if (current := max(map(operator.add, heads, graph.op_times))) < best:
+            best, best_sequence, since_improvement = current, sequence, 0
+            history.append((elapsed(), best))
+
+    return TabuResult(best_sequence, best, iteration, elapsed(), history)